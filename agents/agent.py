@@ -1,19 +1,21 @@
-# agents/agent.py — safer ReAct with parse/429 handling
+# agents/agent.py — safer ReAct with parse-error handling (429s: see agents/llm.py)
 
-import sys, time, re
+import sys, re
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
 from langchain_core.prompts import PromptTemplate
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_core.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI
 
-try:
-    # If google library is present, we'll gracefully handle rate limits
-    from google.api_core.exceptions import ResourceExhausted
-except Exception:  # pragma: no cover
-    class ResourceExhausted(Exception):
-        pass
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # so `python agents/agent.py` can import agents.*
+    sys.path.insert(0, str(ROOT))
+
+from agents.answer_cache import AnswerCache, cacheable
+from agents.llm import gemini
+from agents.streaming import stream_progress, tool_name
 
 # -------------------- Tools (toy example: exchange) --------------------
 
@@ -72,22 +74,23 @@ prompt = PromptTemplate.from_template(REACT_PROMPT)
 
 # -------------------- LLM & Agent --------------------
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0.1,
-)
+@lru_cache(maxsize=None)
+def get_agent_executor() -> AgentExecutor:
+    """Build the LLM + executor on first use, then reuse it."""
+    llm = gemini(temperature=0.1)  # rate-limited and retried with the other agents' calls
 
-agent = create_react_agent(llm, TOOLS, prompt=prompt)
+    agent = create_react_agent(llm, TOOLS, prompt=prompt)
 
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=TOOLS,
-    verbose=False,
-    handle_parsing_errors=True,      # don't crash on minor format drift
-    return_intermediate_steps=False,
-    early_stopping_method="generate",# if stuck, generate a best-effort final
-    max_iterations=4,                # keep it tight
-)
+    return AgentExecutor(
+        agent=agent,
+        tools=TOOLS,
+        verbose=False,
+        handle_parsing_errors=True,      # don't crash on minor format drift
+        return_intermediate_steps=True, # tells a finished answer from a generated one (_remember)
+        early_stopping_method="generate",# if stuck, generate a best-effort final
+        max_iterations=4,                # keep it tight
+        stream_runnable=False,           # steps via invoke, so the LLM cache is checked
+    )
 
 # -------------------- Helpers --------------------
 
@@ -102,27 +105,89 @@ def try_extract_final(text: str) -> Optional[str]:
         return ans.splitlines()[0].strip()
     return None
 
-# -------------------- Main --------------------
+# -------------------- Run API --------------------
 
-if __name__ == "__main__":
-    q = "What is the exchange rate between USD and EUR?"
+QUESTION = "What is the exchange rate between USD and EUR?"
+
+# rates move, so similar questions share an answer for an hour at most (TOOL_EXCHANGE_ANSWER_TTL);
+# the pair must match exactly and in order, and "today"/"now" questions always run
+ANSWERS = AnswerCache.for_agent("tool_exchange", ttl=3600)
+
+def _remember(question: str, answer: str, tools: list):
+    """Cache only a Final Answer the agent reached itself: not one generated at the
+    iteration limit, and never a salvaged parse-error answer (those aren't passed here)."""
+    if cacheable(answer, tools, get_agent_executor().max_iterations):
+        ANSWERS.put(question, answer)
+
+def _tools(out: dict) -> list:
+    return [action.tool for action, _ in out.get("intermediate_steps", ())]
 
-    # One retry on 429 with backoff; also salvage Final Answer from parse errors.
+def run(question: str = QUESTION) -> str:
+    """
+    Salvage a Final Answer from parse errors; 429s are already paced and retried by the
+    shared Gemini limiter (agents/ratelimit.py). Anything unrecoverable is re-raised.
+    """
+    cached = ANSWERS.get(question)
+    if cached is not None:
+        return cached
     try:
-        out = agent_executor.invoke({"input": q})
-        print(out.get("output", "").strip())
-    except ResourceExhausted:
-        print("[rate-limit] Gemini quota hit; waiting 35s and retrying once...", file=sys.stderr)
-        time.sleep(35)
-        out = agent_executor.invoke({"input": q})
-        print(out.get("output", "").strip())
+        out = get_agent_executor().invoke({"input": question})
+        answer = out.get("output", "").strip()
     except Exception as e:
         # If the model produced a Final Answer inside the exception text, surface it.
         salvaged = try_extract_final(str(e))
         if salvaged:
-            print(salvaged)
-        else:
-            # Last resort: show a compact hint and bubble the error message
-            print("Error: could not parse a final answer.\nHint: model emitted both an Action and Final Answer in the same step.", file=sys.stderr)
-            print(str(e), file=sys.stderr)
-            sys.exit(1)
+            return salvaged
+        raise
+    _remember(question, answer, _tools(out))
+    return answer
+
+async def arun(question: str = QUESTION) -> str:
+    cached = ANSWERS.get(question)
+    if cached is not None:
+        return cached
+    try:
+        out = await get_agent_executor().ainvoke({"input": question})
+        answer = out.get("output", "").strip()
+    except Exception as e:
+        salvaged = try_extract_final(str(e))
+        if salvaged:
+            return salvaged
+        raise
+    _remember(question, answer, _tools(out))
+    return answer
+
+async def astream(question: str = QUESTION):
+    """Progress events (see agents.streaming); parse errors still salvage a Final Answer."""
+    cached = ANSWERS.get(question)
+    if cached is not None:
+        yield "final", cached
+        return
+    tools = []
+    try:
+        async for kind, text in stream_progress(get_agent_executor(), {"input": question}):
+            if kind == "tool":
+                tools.append(tool_name(text))
+            elif kind == "final":
+                text = text.strip()
+                _remember(question, text, tools)
+            yield kind, text
+    except Exception as e:
+        salvaged = try_extract_final(str(e))
+        if not salvaged:
+            raise
+        yield "final", salvaged
+
+# -------------------- Main --------------------
+
+def main(argv=None):
+    try:
+        print(run())
+    except Exception as e:
+        # Last resort: show a compact hint and bubble the error message
+        print("Error: could not parse a final answer.\nHint: model emitted both an Action and Final Answer in the same step.", file=sys.stderr)
+        print(str(e), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
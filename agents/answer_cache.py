@@ -0,0 +1,153 @@
+# agents/answer_cache.py — reuse final answers for rephrased questions, without embeddings
+#
+# A question is reduced to an exact cache key (key, words):
+#   key    numbers, upper-case codes, operators/signs/parentheses and operator words
+#          ("plus" -> "+", "times" -> "*") in order, e.g. ("18.75", "3", "+", "15%")
+#          or ("USD", "EUR"); so "USD to EUR" never answers "EUR to USD", "3 pizzas"
+#          never answers "4 pizzas", "2 * 3" never "2 + 3"
+#   words  the set of content words (stopwords dropped, plurals folded)
+# Rephrasing that only reorders words or changes stopwords ("What's ...", "Please ...")
+# maps to the same key; an added or dropped content word ("... in euros", "... rounded")
+# changes the question and is a miss. A lookup is one dict access. A question with no
+# content words (bare arithmetic like "2 + 3?") is never cached: the key alone must not
+# decide a hit.
+#
+# Per agent: AnswerCache.for_agent("react_calculator", ttl=...) reads <KEY>_ANSWER_TTL
+# from the env (0 disables). Questions that mention "today", "latest", "now"... are
+# skipped unless the cache is volatile=True, i.e. its TTL is already the freshness bound
+# (the stock agent). Only answers the agent finished on its own are worth keeping; see
+# cacheable().
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+_TOKEN = re.compile(r"\$?\d[\d,]*(?:\.\d+)?%?|[A-Za-z]+|\*\*|[-+*/^%×÷()]")
+_OPERATORS = {"^": "**", "×": "*", "÷": "/"}  # symbol spellings -> one canonical form
+_OPERATOR_WORDS = {
+    "plus": "+", "add": "+", "added": "+", "sum": "+",
+    "minus": "-", "subtract": "-", "subtracted": "-", "less": "-", "difference": "-", "negative": "-",
+    "times": "*", "multiply": "*", "multiplied": "*", "product": "*", "x": "*",
+    "divide": "/", "divided": "/", "quotient": "/", "over": "/",
+    "power": "**", "squared": "**2", "cubed": "**3", "percent": "%", "mod": "mod", "modulo": "mod",
+}
+_CODE = re.compile(r"^[A-Z]{2,5}$")  # tickers, currency codes
+_TIME_SENSITIVE = re.compile(
+    r"\b(today|tonight|now|current(ly)?|latest|live|real[- ]time|yesterday|tomorrow|this (morning|week|month))\b",
+    re.I,
+)
+_STOPWORDS = frozenset(
+    "a an the is are was were be of to for in on at by and or if i me my we you your it "
+    "what whats how much many does do can could would please tell give show find between "
+    "from into with about want s".split()  # "s": what's, it's
+)
+
+
+def _number(tok: str) -> str:
+    pct = tok.endswith("%")
+    num = tok.strip("$%").replace(",", "")
+    if "." in num:
+        num = num.rstrip("0").rstrip(".")
+    return num + ("%" if pct else "")
+
+def _fold(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+def fingerprint(question: str) -> tuple[tuple, frozenset]:
+    """(arithmetic/code key, content words) for a question; together they are its cache key."""
+    question = question or ""
+    key, words = [], []
+    for m in _TOKEN.finditer(question):
+        tok = m.group()
+        if tok[0].isdigit() or tok[0] == "$":
+            key.append(_number(tok))
+        elif tok[0].isalpha():
+            w = tok.lower()
+            if _CODE.match(tok):
+                key.append(tok)
+                words.append(w)
+            elif w in _OPERATOR_WORDS:
+                key.append(_OPERATOR_WORDS[w])
+            elif w not in _STOPWORDS:
+                words.append(_fold(w))
+        elif tok == "-" and question[m.start() - 1:m.start()].isalpha() and question[m.end():m.end() + 1].isalpha():
+            continue  # a hyphenated word ("real-time"), not a minus sign
+        else:
+            key.append(_OPERATORS.get(tok, tok))
+    return tuple(key), frozenset(words)
+
+
+# what AgentExecutor returns when it hits max_iterations / max_execution_time
+# with early_stopping_method="force"
+STOPPED_OUTPUT = "Agent stopped due to iteration limit or time limit."
+
+def cacheable(output: str, tools: Sequence[str], max_iterations: Optional[int] = None) -> bool:
+    """
+    True if `output` is a Final Answer the agent reached by itself, given the names of the
+    tools it called: not the executor's stop message, not a best-effort answer generated
+    at the iteration limit (early_stopping_method="generate"), and not a run that needed
+    a parse-error retry (tool "_Exception").
+    """
+    if not output or output.strip() == STOPPED_OUTPUT:
+        return False
+    if "_Exception" in tools:
+        return False
+    return max_iterations is None or len(tools) < max_iterations
+
+
+class AnswerCache:
+    def __init__(self, name: str, ttl: float, max_entries: int = 512, volatile: bool = False):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.volatile = volatile
+        self.hits = self.misses = 0
+        self._entries: OrderedDict = OrderedDict()  # (key, words) -> (answer, stored_at), LRU first
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_agent(cls, key: str, ttl: float, **kwargs) -> "AnswerCache":
+        return cls(key, ttl=float(os.getenv(f"{key.upper()}_ANSWER_TTL", ttl)), **kwargs)
+
+    def _key(self, question: str) -> Optional[tuple]:
+        if self.ttl <= 0 or (not self.volatile and _TIME_SENSITIVE.search(question or "")):
+            return None
+        key, words = fingerprint(question)
+        return (key, words) if words else None
+
+    def get(self, question: str) -> Optional[str]:
+        """A prior answer to the same question (up to rephrasing), or None."""
+        k = self._key(question)
+        if k is None:
+            return None
+        with self._lock:
+            hit = self._entries.get(k)
+            if hit is not None and time.monotonic() - hit[1] > self.ttl:
+                del self._entries[k]
+                hit = None
+            if hit is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(k)
+            return hit[0]
+
+    def put(self, question: str, answer: str):
+        k = self._key(question)
+        if not answer or k is None:
+            return
+        with self._lock:
+            self._entries[k] = (answer, time.monotonic())
+            self._entries.move_to_end(k)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"agent": self.name, "entries": len(self._entries), "hits": self.hits, "misses": self.misses}
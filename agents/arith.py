@@ -0,0 +1,85 @@
+# agents/arith.py — safe arithmetic for the calculator tool (replaces eval)
+#
+# An expression is parsed once with ast, checked against a whitelist (numbers, + - * / **,
+# unary +/-, parentheses) and compiled into a tree of closures; compiled expressions are
+# kept in an LRU cache, so a ReAct loop re-checking the same expression pays nothing.
+# Names, calls, attributes and every other node are rejected before anything runs.
+#
+# Friendly input: "$18.75", "15%" (-> 0.15), "15% of 200", "2^10", "×" and "÷" are accepted.
+# Bounds: expressions over MAX_LEN chars, and powers whose result would exceed MAX_BITS
+# bits, raise ValueError instead of eating CPU/memory (9**9**9 fails instantly).
+
+import ast
+import math
+import operator
+import re
+from functools import lru_cache
+from typing import Callable, Union
+
+Number = Union[int, float]
+
+MAX_LEN = 500      # characters
+MAX_BITS = 4096    # largest integer power result (~1233 digits)
+MAX_EXPONENT = 1e4 # float powers; anything bigger over/underflows anyway
+
+_PERCENT_OF = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*of\b", re.I)
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+_SPELLING = str.maketrans({"×": "*", "÷": "/", "$": "", "€": "", "£": ""})
+
+_BINOPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def _short(n: Number) -> str:
+    # error messages go back to the model: a huge operand is described, not printed
+    if isinstance(n, int) and n.bit_length() > 64:
+        return f"<{'-' if n < 0 else ''}{n.bit_length()}-bit integer>"
+    return str(n)
+
+def _pow(base: Number, exp: Number) -> Number:
+    if isinstance(base, int) and isinstance(exp, int) and exp > 0 and abs(base) > 1:
+        if exp * math.log2(abs(base)) > MAX_BITS:
+            raise ValueError(f"power too large: {_short(base)}**{_short(exp)}")
+    elif abs(exp) > MAX_EXPONENT:
+        raise ValueError(f"exponent too large: {_short(exp)}")
+    return base ** exp
+
+def normalize(expression: str) -> str:
+    """Rewrite calculator spellings into Python arithmetic ("15%" -> "(15/100)", "^" -> "**")."""
+    s = expression.strip().replace("^", "**").translate(_SPELLING)
+    s = _PERCENT_OF.sub(r"(\1/100)*", s)
+    return _PERCENT.sub(r"(\1/100)", s)
+
+def _build(node: ast.AST) -> Callable[[], Number]:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda: value
+    if isinstance(node, ast.BinOp):
+        left, right = _build(node.left), _build(node.right)
+        if isinstance(node.op, ast.Pow):
+            return lambda: _pow(left(), right())
+        op = _BINOPS.get(type(node.op))
+        if op is not None:
+            return lambda: op(left(), right())
+        raise ValueError(f"unsupported operator: {type(node.op).__name__}")
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        op, operand = _UNARY[type(node.op)], _build(node.operand)
+        return lambda: op(operand())
+    raise ValueError(f"unsupported syntax: {type(node).__name__}")
+
+@lru_cache(maxsize=1024)
+def compile_expr(expression: str) -> Callable[[], Number]:
+    """Validate and compile once; call the result to evaluate. Raises ValueError."""
+    if len(expression) > MAX_LEN:
+        raise ValueError(f"expression longer than {MAX_LEN} characters")
+    try:
+        tree = ast.parse(normalize(expression), mode="eval")
+        return _build(tree.body)
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression: {e.msg}") from None
+    except RecursionError:
+        raise ValueError("expression nested too deeply") from None
+
+def evaluate(expression: str) -> Number:
+    """The value of an arithmetic expression; ValueError/ZeroDivisionError/OverflowError on bad input."""
+    return compile_expr(expression)()
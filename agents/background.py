@@ -0,0 +1,52 @@
+# agents/background.py — the one long-lived event loop shared by the agent modules
+#
+# The pooled httpx client (agents/quotes.py) and the cached Gemini client (whose grpc.aio
+# channel binds to the first loop it runs on) both need a loop that outlives any single
+# call. Both live here, on one daemon thread: sync callers block on submit(...).result(),
+# async callers await on_loop(...). Never block on .result() from the loop thread itself.
+
+import asyncio
+import threading
+from typing import Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="agents-background", daemon=True).start()
+            _loop = loop
+    return _loop
+
+def submit(coro):
+    """Schedule `coro` on the background loop; returns a concurrent.futures.Future."""
+    return asyncio.run_coroutine_threadsafe(coro, background_loop())
+
+async def on_loop(coro):
+    return await asyncio.wrap_future(submit(coro))
+
+async def aiter_on_loop(agen):
+    """Iterate an async generator on the background loop, yielding its items here."""
+    loop, queue, done = asyncio.get_running_loop(), asyncio.Queue(), object()
+
+    async def pump():
+        try:
+            async for item in agen:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            await agen.aclose()
+
+    fut = submit(pump())
+    try:
+        while (item := await queue.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        fut.cancel()
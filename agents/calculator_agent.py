@@ -1,10 +1,21 @@
 import os
+import sys
+from functools import lru_cache
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.tools import tool
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain_core.prompts import PromptTemplate
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # so `python agents/calculator_agent.py` can import agents.*
+    sys.path.insert(0, str(ROOT))
+
+from agents.answer_cache import AnswerCache, cacheable
+from agents.arith import evaluate
+from agents.llm import gemini
+from agents.streaming import stream_progress, tool_name
+
 load_dotenv()
 print("API Key Loaded:", os.getenv("GOOGLE_API_KEY") is not None)
 
@@ -12,19 +23,19 @@ print("API Key Loaded:", os.getenv("GOOGLE_API_KEY") is not None)
 def calculator(expression: str) -> str:
     """
     Use this tool to evaluate a mathematical expression.
-    It can handle addition, mutliplication, subtraction, division and exponents.
-    Example: `calculator("2 + 2")` or `calculator('3**4')`
+    It can handle addition, mutliplication, subtraction, division, exponents,
+    parentheses and percentages.
+    Example: `calculator("2 + 2")`, `calculator('3**4')` or `calculator("18.75 * 3 * (1 + 15%)")`
     """
     try:
-        return str(eval(expression))
+        # arithmetic only (agents/arith.py): no eval of model output
+        return str(evaluate(expression.strip().strip("`'\"")))
     except Exception as e:
         return f"Error evaluating expression: {e}"
     
 tools = [calculator]
 
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.2)
-
 template = """
 Answer the following questions as best you can. 
 You have access to the following tools:
@@ -46,16 +57,62 @@ Thought:{agent_scratchpad}
 
 prompt = PromptTemplate.from_template(template)
 
-agent = create_react_agent(llm, tools, prompt)
+@lru_cache(maxsize=None)
+def get_agent_executor() -> AgentExecutor:
+    """Build the LLM + ReAct executor on first use, then reuse it."""
+    llm = gemini(temperature=0.2)
+    agent = create_react_agent(llm, tools, prompt)
+    # stream_runnable=False: steps go through invoke, which checks the LLM cache (agents/llm.py)
+    # intermediate steps tell a finished answer from a stopped run (see _remember)
+    return AgentExecutor(agent=agent, tools=tools, verbose=True, stream_runnable=False,
+                         return_intermediate_steps=True)
 
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+QUESTION = "If a pizza costs $18.75 and I want to buy 3, plus a 15% tip, what is the total cost?"
 
-if __name__ == "__main__":
-    print("Starting agent...")
+# arithmetic answers don't go stale; a rephrased question with the same numbers reuses one
+ANSWERS = AnswerCache.for_agent("react_calculator", ttl=86400)
+
+def _remember(question: str, answer: str, tools: list):
+    """Cache only a Final Answer the agent reached itself, never a stopped run."""
+    if cacheable(answer, tools, get_agent_executor().max_iterations):
+        ANSWERS.put(question, answer)
 
-    question = "If a pizza costs $18.75 and I want to buy 3, plus a 15% tip, what is the total cost?"
+def _tools(result: dict) -> list:
+    return [action.tool for action, _ in result.get("intermediate_steps", ())]
 
-    result = agent_executor.invoke({"input": question})
+def run(question: str = QUESTION) -> str:
+    cached = ANSWERS.get(question)
+    if cached is not None:
+        return cached
+    result = get_agent_executor().invoke({"input": question})
+    _remember(question, result['output'], _tools(result))
+    return result['output']
 
-    print("Final Answer:", result['output'])
+async def arun(question: str = QUESTION) -> str:
+    cached = ANSWERS.get(question)
+    if cached is not None:
+        return cached
+    result = await get_agent_executor().ainvoke({"input": question})
+    _remember(question, result['output'], _tools(result))
+    return result['output']
 
+async def astream(question: str = QUESTION):
+    cached = ANSWERS.get(question)
+    if cached is not None:
+        yield "final", cached
+        return
+    tools = []
+    async for kind, text in stream_progress(get_agent_executor(), {"input": question}):
+        if kind == "tool":
+            tools.append(tool_name(text))
+        elif kind == "final":
+            _remember(question, text, tools)
+        yield kind, text
+
+def main(argv=None):
+    print("Starting agent...")
+
+    print("Final Answer:", run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# agents/concurrency.py — per-agent in-flight limits with a bounded wait queue
+#
+# The Gradio handler takes a slot on the agent's gate before running it. Up to `limit`
+# runs are in flight per agent (e.g. to stay inside the Gemini quota), up to `max_queue`
+# more wait in FIFO order, and anything beyond that is rejected right away with
+# AgentBusy instead of piling up and dragging p99 latency with it.
+
+import asyncio
+from collections import deque
+
+
+class AgentBusy(Exception):
+    """Raised when an agent's wait queue is full."""
+
+
+class ConcurrencyGate:
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.max_queue = max(0, int(max_queue))
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def depth(self) -> dict:
+        return {"agent": self.name, "in_flight": self.in_flight, "limit": self.limit,
+                "waiting": self.waiting, "max_queue": self.max_queue}
+
+    async def wait_turn(self, poll: float = 1.0):
+        """
+        Async generator: yields the caller's 1-based queue position while it waits and
+        finishes once a slot is held. The caller must release() after its run.
+        Raises AgentBusy if the queue is already full.
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AgentBusy(
+                f"{self.name} is busy ({self.in_flight} running, {self.waiting} queued). Try again shortly."
+            )
+
+        turn = asyncio.get_running_loop().create_future()
+        self._waiters.append(turn)
+        try:
+            while not turn.done():
+                yield self._waiters.index(turn) + 1
+                try:
+                    await asyncio.wait_for(asyncio.shield(turn), poll)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # left the queue early (client gone / cancelled)
+            if turn.done():
+                self.release()  # a slot was already handed to us; pass it on
+            else:
+                self._waiters.remove(turn)
+                turn.cancel()
+            raise
+
+    def release(self):
+        """Hand the slot straight to the next waiter, or free it."""
+        while self._waiters:
+            turn = self._waiters.popleft()
+            if not turn.done():
+                turn.set_result(None)
+                return
+        self.in_flight -= 1
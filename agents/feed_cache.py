@@ -0,0 +1,114 @@
+# agents/feed_cache.py — small on-disk cache for HTTP feed responses
+#
+# One JSON file per URL (named by its SHA-1) holding the validators the server gave us
+# (ETag / Last-Modified), when we last heard from it, and the parsed rows. Callers reuse
+# the rows inside a short TTL, and after that revalidate with a conditional GET so an
+# unchanged feed costs a 304 and no parsing.
+#
+# The directory is bounded: adding a file prunes entries older than max_age and then the
+# least recently written ones beyond max_entries (FEED_CACHE_MAX / FEED_CACHE_MAX_AGE).
+# A shorter, early-stopped row set never replaces a fuller one carrying the same ETag /
+# Last-Modified; with neither validator present the newer fetch always wins.
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_DIR = Path(os.getenv("FEED_CACHE_DIR", ROOT / ".cache" / "feeds"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX", "256"))
+DEFAULT_MAX_AGE = float(os.getenv("FEED_CACHE_MAX_AGE", str(7 * 86400)))  # seconds
+
+
+def _fuller(old: dict, new: dict) -> bool:
+    """True if `old` holds more of the same feed version than `new`."""
+    validators = (old.get("etag"), old.get("last_modified"))
+    # without any validator there is no evidence it is the same version: the newer fetch wins
+    same_version = any(validators) and validators == (new.get("etag"), new.get("last_modified"))
+    if new.get("complete") or not same_version:
+        return False
+    return bool(old.get("complete")) or len(old.get("rows", [])) > len(new.get("rows", []))
+
+
+class FeedCache:
+    def __init__(self, directory: Path = DEFAULT_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+    def _path(self, url: str) -> Path:
+        return self.directory / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def save(self, url: str, entry: dict):
+        """Atomic write (temp file + rename), so concurrent readers never see half a file."""
+        entry = dict(entry, url=url)
+        path = self._path(url)
+        old = self.load(url)
+        if old is not None and _fuller(old, entry):
+            # same feed version, but we stopped earlier this time: keep the longer rows
+            entry = dict(old, fetched_at=entry.get("fetched_at", time.time()))
+        is_new = old is None and not path.exists()
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            # a cache that can't write is just a miss next time
+            if tmp and os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        if is_new:
+            self.prune()
+
+    def prune(self):
+        """Drop entries older than max_age, then the oldest beyond max_entries."""
+        try:
+            files = []
+            for p in self.directory.glob("*.json"):
+                try:
+                    files.append((p.stat().st_mtime, p))
+                except OSError:
+                    continue  # removed by a concurrent prune
+        except OSError:
+            return
+        files.sort()
+        cutoff = time.time() - self.max_age
+        excess = len(files) - self.max_entries
+        for i, (mtime, p) in enumerate(files):
+            if mtime >= cutoff and i >= excess:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+    def touch(self, url: str, entry: dict):
+        """Server said 304: same rows, fresh timestamp."""
+        self.save(url, dict(entry, fetched_at=time.time()))
+
+    @staticmethod
+    def validators(entry: Optional[dict]) -> dict:
+        """Conditional-request headers for a cached entry."""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
@@ -2,10 +2,9 @@
 
 from pathlib import Path
 from dotenv import load_dotenv
-import gradio as gr
-import subprocess, sys, re
+import asyncio, os, sys, re
 
-# --- strip ANSI colors from child scripts ---
+# --- strip ANSI colors from agent output ---
 ANSI = re.compile(r"\x1b\[[0-9;]*m")
 def _clean(s: str) -> str:
     return ANSI.sub("", (s or "").strip())
@@ -14,74 +13,173 @@ def _clean(s: str) -> str:
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env")
 
 ROOT = Path(__file__).resolve().parents[1]
-AGENTS = {
-    "Calculator": ROOT / "agents" / "calculator_agent.py",
-    "Currency Exchange": ROOT / "agents" / "agent.py",
-    "Stock & Headlines (Gemini)": ROOT / "agents" / "langchain_gemini_agent.py",
-}
+if str(ROOT) not in sys.path:  # allow `python agents/gradio_app.py` as well as `-m`
+    sys.path.insert(0, str(ROOT))
+
+from agents import registry
+from agents.concurrency import AgentBusy
+from agents.langchain_gemini_agent import MODES
+from agents.worker_pool import AgentWorkerPool
+
+STOCK_AGENT = "Stock & Headlines (Gemini)"
+
+# Requests waiting in Gradio's own queue before it turns new ones away. Per-agent
+# limits live on registry gates (see agents/concurrency.py), so the click handler
+# itself is not capped by Gradio (its default of 1 would serialize every user).
+QUEUE_MAX_SIZE = int(os.getenv("GRADIO_QUEUE_MAX", "64"))
+
+# Agents run in-process by default (imports + executors are built once and reused).
+# AGENT_WORKERS=1 moves them into warm worker processes instead, as many per agent as its
+# gate admits. Set up in main(), never at import: spawned workers re-import this module.
+POOL = None
 
 # -------------------- backend run helper --------------------
-def run_agent(choice, ticker, max_headlines, freshness):
-    """Runs selected agent and returns cleaned stdout/stderr."""
-    cmd = [sys.executable]
-    if choice == "Calculator":
-        cmd += [str(AGENTS["Calculator"])]
-    elif choice == "Currency Exchange":
-        cmd += [str(AGENTS["Currency Exchange"])]
-    elif choice == "Stock & Headlines (Gemini)":
-        cmd += [
-            str(AGENTS["Stock & Headlines (Gemini)"]),
-            "--ticker", ticker or "NVDA",
-            "--max", str(max_headlines or 4),
-            "--fresh", str(freshness or 1),
-        ]
-    else:
+def run_agent(choice, ticker, max_headlines, freshness, mode="react"):
+    """Runs selected agent and returns its cleaned final output."""
+    try:
+        agent = registry.get(choice)
+    except KeyError:
         return "Unknown agent choice."
 
+    kwargs = dict(ticker=ticker or "NVDA", max=int(max_headlines or 4), fresh=int(freshness or 1), mode=mode)
     try:
-        res = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        out = res.stdout or res.stderr
-        return _clean(out)
+        if POOL is not None:
+            ok, out = POOL.run(agent.key, **kwargs)
+            return _clean(out) if ok else f"Error running agent: {out}"
+        return _clean(agent.run(**kwargs))
     except Exception as e:
         return f"Error running agent: {e}"
 
-# -------------------- Gradio UI --------------------
-with gr.Blocks(theme=gr.themes.Soft()) as demo:
-    gr.Markdown("## 🤖 Multi-Agent Demo (Calculator • FX • Stocks)")
-
-    with gr.Row():
-        agent_choice = gr.Dropdown(
-            label="Select Agent",
-            choices=list(AGENTS.keys()),
-            value="Stock & Headlines (Gemini)",
-        )
+# -------------------- streaming run helper --------------------
+def _short(s: str, n: int = 160) -> str:
+    s = " ".join((s or "").split())
+    return s if len(s) <= n else s[: n - 1] + "…"
 
-    with gr.Row():
-        # Visible by default for Gemini; hidden for others via callback below
-        ticker = gr.Textbox(label="Ticker (for Gemini agent)", value="NVDA", visible=True)
-        max_headlines = gr.Slider(label="Max Headlines", minimum=1, maximum=5, step=1, value=4, visible=True)
-        freshness = gr.Slider(label="Recency (days)", minimum=1, maximum=7, step=1, value=1, visible=True)
+def _render(progress: list[str], answer: str) -> str:
+    parts = ["\n".join(progress)] if progress else []
+    if answer:
+        parts.append("----Final Result----\n" + _clean(answer))
+    return "\n\n".join(parts)
 
-    run_btn = gr.Button("🚀 Run Agent")
-    output_box = gr.Textbox(label="Agent Output", lines=20)
+async def run_agent_stream(choice, ticker, max_headlines, freshness, stream=True, mode="react"):
+    """
+    Generator handler: yields the output box contents as the agent works —
+    queue position while waiting for a slot, then tool calls and observations,
+    then the Final Answer token by token.
+    Falls back to a single result when streaming is off or agents run in workers.
+    """
+    try:
+        agent = registry.get(choice)
+    except KeyError:
+        yield "Unknown agent choice."
+        return
 
-    run_btn.click(
-        fn=run_agent,
-        inputs=[agent_choice, ticker, max_headlines, freshness],
-        outputs=output_box,
-    )
+    try:
+        async for pos in agent.gate.wait_turn():
+            yield f"Queued for {agent.label}: position {pos} ({agent.gate.in_flight} running)…"
+    except AgentBusy as e:
+        yield str(e)
+        return
 
-    # Dynamic hide/show of Gemini-only inputs
-    def toggle_inputs(choice):
-        show = choice == "Stock & Headlines (Gemini)"
-        return gr.update(visible=show), gr.update(visible=show), gr.update(visible=show)
+    try:
+        if not stream or POOL is not None:
+            yield await asyncio.to_thread(run_agent, choice, ticker, max_headlines, freshness, mode)
+            return
+
+        progress, answer = [], ""
+        yield "Running…"
+        try:
+            async for kind, text in agent.astream(
+                ticker=ticker or "NVDA", max=int(max_headlines or 4), fresh=int(freshness or 1), mode=mode
+            ):
+                if kind == "tool":
+                    progress.append(f"🔧 {_short(text)}")
+                elif kind == "observation":
+                    progress.append(f"   ↳ {_short(text)}")
+                elif kind == "token":
+                    answer += text
+                elif kind == "final":
+                    answer = text
+                yield _render(progress, answer)
+        except Exception as e:
+            progress.append(f"Error running agent: {e}")
+            yield _render(progress, answer)
+    finally:
+        agent.gate.release()
 
-    agent_choice.change(
-        fn=toggle_inputs,
-        inputs=[agent_choice],
-        outputs=[ticker, max_headlines, freshness],
+def queue_status() -> str:
+    """One line per agent: running/limit and queued/max."""
+    return "  \n".join(
+        f"**{d['agent']}** — running {d['in_flight']}/{d['limit']}, queued {d['waiting']}/{d['max_queue']}"
+        for d in registry.queue_depths()
     )
 
+# -------------------- Gradio UI --------------------
+def build_demo():
+    import gradio as gr
+
+    with gr.Blocks(theme=gr.themes.Soft()) as demo:
+        gr.Markdown("## 🤖 Multi-Agent Demo (Calculator • FX • Stocks)")
+
+        with gr.Row():
+            agent_choice = gr.Dropdown(
+                label="Select Agent",
+                choices=registry.labels(),
+                value=STOCK_AGENT,
+            )
+
+        with gr.Row():
+            # Visible by default for Gemini; hidden for others via callback below
+            ticker = gr.Textbox(label="Ticker (for Gemini agent)", value="NVDA", visible=True)
+            max_headlines = gr.Slider(label="Max Headlines", minimum=1, maximum=5, step=1, value=4, visible=True)
+            freshness = gr.Slider(label="Recency (days)", minimum=1, maximum=7, step=1, value=1, visible=True)
+            # "tools": one Gemini turn requests both tools; "structured": same, answer submitted
+            # as a typed object; "direct": no Gemini at all
+            mode = gr.Radio(label="Mode", choices=list(MODES), value="react", visible=True)
+
+        with gr.Row():
+            run_btn = gr.Button("🚀 Run Agent")
+            stream = gr.Checkbox(label="Stream progress", value=True)
+        output_box = gr.Textbox(label="Agent Output", lines=20)
+        status = gr.Markdown()
+
+        run_btn.click(
+            fn=queue_status, outputs=status, queue=False,
+        ).then(
+            fn=run_agent_stream,
+            inputs=[agent_choice, ticker, max_headlines, freshness, stream, mode],
+            outputs=output_box,
+            concurrency_limit=None,
+        ).then(
+            fn=queue_status, outputs=status, queue=False,
+        )
+        demo.load(fn=queue_status, outputs=status)
+
+        # Dynamic hide/show of Gemini-only inputs
+        def toggle_inputs(choice):
+            show = choice == STOCK_AGENT
+            return tuple(gr.update(visible=show) for _ in range(4))
+
+        agent_choice.change(
+            fn=toggle_inputs,
+            inputs=[agent_choice],
+            outputs=[ticker, max_headlines, freshness, mode],
+        )
+
+    return demo.queue(max_size=QUEUE_MAX_SIZE)
+
 # -------------------- Run --------------------
+def main():
+    global POOL
+    if os.getenv("AGENT_WORKERS") == "1":
+        POOL = AgentWorkerPool({key: a.gate.limit for key, a in registry.AGENTS.items()})
+    # pay the import/executor cost up front, before the first click
+    if POOL is not None:
+        POOL.warm()
+    else:
+        for a in registry.AGENTS.values():
+            a.warm()
+    build_demo().launch(server_name="127.0.0.1", server_port=7860, share=False)
+
 if __name__ == "__main__":
-    demo.launch(server_name="127.0.0.1", server_port=7860, share=False)
+    main()
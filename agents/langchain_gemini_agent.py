@@ -5,70 +5,59 @@ from dotenv import load_dotenv
 # Looks for a .env one directory above this file (project root)
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env")
 
+import asyncio
+import os
 import sys
-import re
+import time
 import argparse
-import json
 import requests
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse, parse_qs, quote
 from xml.etree import ElementTree as ET
 
-# LangChain / LLM
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.tools import tool
-from langchain.agents import AgentExecutor, create_react_agent
+# LangChain, the Gemini client, httpx (quotes) and pandas/yfinance are all imported
+# lazily in get_tools()/get_llm()/the executor builders: --help, the format helpers and the plain
+# news_headlines function load in a fraction of the time (see benchmarks/import_time.py).
+if TYPE_CHECKING:  # annotations only
+    from langchain.agents import AgentExecutor
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # so `python agents/langchain_gemini_agent.py` can import agents.*
+    sys.path.insert(0, str(ROOT))
+
+from agents.answer_cache import AnswerCache
+from agents.background import aiter_on_loop, on_loop, submit
+from agents.feed_cache import FeedCache
+from agents.streaming import FINAL_MARKER, stream_progress
+from agents.textnorm import (
+    Brief, Headline, brief_from_text, brief_to_json, clean_title, format_guard, render_brief,
+    split_publisher, title_words, to_json,
+)
 
 # -------- runtime-tunable defaults (overridden by CLI) --------
 HEADLINE_FRESH_DAYS = 1   # recency window for Google News: when:<d>
 HEADLINE_MAX = 4          # number of headlines to return (3–5 recommended)
 
+# per-run (max, fresh) overrides; a ContextVar so concurrent in-process runs don't clash
+_headline_opts: ContextVar = ContextVar("headline_opts", default=None)
+
+def _headline_settings() -> tuple[int, int]:
+    """(max headlines, fresh days) for the current run, falling back to module defaults."""
+    return _headline_opts.get() or (int(HEADLINE_MAX), int(HEADLINE_FRESH_DAYS))
+
 # ------------------------------ Tools ------------------------------
 
-@tool
-def get_stock_price(ticker: str) -> str:
-    """Latest price for a ticker (e.g., NVDA). Tries Stooq (with .us) then Yahoo."""
-    import pandas as pd
-    import yfinance as yf
-
-    if not ticker:
-        return "No ticker given."
-
-    t = ticker.strip().upper()
-    # Stooq needs '.us' for US tickers, but try both
-    candidates = [t.lower(), f"{t.lower()}.us"]
-
-    # 1) Stooq (no key) with timeout + robust read
-    for sym in candidates:
-        try:
-            url = f"https://stooq.com/q/d/l/?s={sym}&i=d"
-            resp = requests.get(url, timeout=10)
-            if resp.ok and resp.text.strip():
-                df = pd.read_csv(StringIO(resp.text))
-                if not df.empty and "Close" in df.columns:
-                    last = float(df["Close"].iloc[-1])
-                    label = sym.upper()
-                    return f"The latest price of {t} is ${last:.2f} (Stooq {label})."
-        except Exception:
-            # try next source
-            pass
-
-    # 2) Yahoo Finance fallback (no key)
-    try:
-        fast = getattr(yf.Ticker(t), "fast_info", None)
-        if fast:
-            last = getattr(fast, "last_price", None) or (fast.get("last_price") if isinstance(fast, dict) else None)
-            if last:
-                return f"The latest price of {t} is ${float(last):.2f} (Yahoo)."
-        # backup: small historical window
-        hist = yf.download(t, period="5d", interval="1d", progress=False)
-        if not hist.empty:
-            return f"Recent close for {t} is ${float(hist['Close'][-1]):.2f} (Yahoo)."
-        return f"No price data returned for {t}. Try later or another ticker."
-    except Exception as e:
-        return f"Price lookup error for {t}: {e}"
+def _stock_prices(tickers: str) -> str:
+    from agents import quotes
+    return quotes.format_table(quotes.get_quotes(tickers))
 
+async def _astock_prices(tickers: str) -> str:
+    from agents import quotes
+    return quotes.format_table(await quotes.aget_quotes(tickers))
 
 def _unwrap_google_news(url: str) -> str:
     try:
@@ -92,51 +81,157 @@ def _short_host(url: str) -> str:
     except Exception:
         return url
 
-def _clean_title(s: str) -> str:
-    # drop parentheticals like (NASDAQ:NVDA)
-    s = re.sub(r"\s*\([^)]+\)", "", s)
-    # collapse extra spaces/dashes
-    s = re.sub(r"\s{2,}", " ", s).strip()
-    return s
+RSS_CHUNK = 8192  # bytes per network read while parsing the feed
+NEWS_TTL = float(os.getenv("NEWS_TTL", "120"))  # seconds a cached feed is reused without asking
+_FEEDS = FeedCache()
+
+def _rss_url(query: str, fresh_days: int) -> str:
+    # build query with recency window; localized for Canada/English
+    q = f"{query} when:{fresh_days}d"
+    return (
+        f"https://news.google.com/rss/search?q={quote(q)}"
+        f"&hl=en-CA&gl=CA&ceid=CA:en"
+    )
+
+def _iter_rss_items(chunks):
+    """
+    Yield (title, link) per <item> while the feed is still downloading.
+    Items are parsed incrementally and cleared once read, so the caller can stop
+    (and close the response) as soon as it has enough. A feed read to the end is
+    closed, so a truncated or malformed one raises ET.ParseError.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+
+    def items():
+        for _, el in parser.read_events():
+            if el.tag == "item":
+                yield (el.findtext("title") or "").strip(), (el.findtext("link") or "").strip()
+                el.clear()
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from items()
+    parser.close()
+    yield from items()
+
+def _parse_rows(chunks, max_rows: int) -> tuple[list, bool]:
+    """Unique [title, link, host] rows from a streaming feed; complete=False if we stopped early."""
+    rows = []
+    seen_titles = set()
+    for title, link in _iter_rss_items(chunks):
+        link = _unwrap_google_news(link)
+        host = _short_host(link)
+        title = clean_title(title)
+        if title and link and title not in seen_titles:
+            rows.append([title, link, host])
+            seen_titles.add(title)
+        if len(rows) >= max_rows:
+            return rows, False  # the rest of the feed is never read
+    return rows, True  # only reached once the parser closed cleanly
+
+def _fetch_rows(url: str, max_rows: int) -> list:
+    """
+    Headline rows for a feed URL, via the on-disk feed cache:
+      - cached within NEWS_TTL and holding enough rows -> no request at all
+      - older -> conditional GET (ETag / Last-Modified); 304 reuses the parsed rows
+      - cache holds fewer rows than asked for (earlier early-stop) -> plain GET
+    """
+    entry = _FEEDS.load(url)
+    usable = entry is not None and (entry.get("complete") or len(entry.get("rows", [])) >= max_rows)
+    if usable and time.time() - entry.get("fetched_at", 0) < NEWS_TTL:
+        return entry["rows"][:max_rows]
+
+    headers = FeedCache.validators(entry) if usable else {}
+    with requests.get(url, headers=headers, timeout=15, stream=True) as resp:
+        if resp.status_code == 304 and usable:
+            _FEEDS.touch(url, entry)
+            return entry["rows"][:max_rows]
+        resp.raise_for_status()
+        # leaving the with-block closes the connection if we stopped early
+        rows, complete = _parse_rows(resp.iter_content(chunk_size=RSS_CHUNK), max_rows)
+        _FEEDS.save(url, {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "complete": complete,
+            "rows": rows,
+        })
+    return rows
 
-@tool
 def news_headlines(query: str) -> str:
     """Return up to N recent headlines via Google News RSS (no API key), plain lines."""
     try:
-        # build query with recency window; localized for Canada/English
-        q = f"{query} when:{HEADLINE_FRESH_DAYS}d"
-        rss_url = (
-            f"https://news.google.com/rss/search?q={quote(q)}"
-            f"&hl=en-CA&gl=CA&ceid=CA:en"
-        )
-        xml = requests.get(rss_url, timeout=15).text
-        root = ET.fromstring(xml)
-        rows = []
-        seen_titles = set()
-        for item in root.findall(".//item"):
-            title = (item.findtext("title") or "").strip()
-            link = (item.findtext("link") or "").strip()
-            link = _unwrap_google_news(link)
-            host = _short_host(link)
-            title = _clean_title(title)
-            if title and link and title not in seen_titles:
-                rows.append(f"{title} | {link} | {host}")
-                seen_titles.add(title)
-            if len(rows) >= int(HEADLINE_MAX):
-                break
-        return "\n".join(rows) if rows else "No headlines found."
+        max_rows, fresh_days = _headline_settings()
+        rows = _fetch_rows(_rss_url(query, fresh_days), max_rows)
+        return "\n".join(f"{title} | {link} | {host}" for title, link, host in rows) if rows else "No headlines found."
     except Exception as e:
         return f"Headline fetch error: {e}"
 
-# ------------------------------ LLM / Prompt ------------------------------
+MULTI_QUERY_MAX = 5    # queries fanned out per news_headlines_multi call
+NEAR_DUP_JACCARD = 0.8  # word-overlap above which two titles count as the same story
+
+def _outlet(title: str, host: str) -> str:
+    # links mostly stay news.google.com redirects, so the " - Publisher" tag names the
+    # outlet; the host only counts when it is the publisher's own site
+    publisher = split_publisher(title)[1]
+    if publisher:
+        return publisher.lower()
+    return "" if host.endswith("news.google.com") else host
+
+def _is_near_dup(words: frozenset, outlet: str, kept: list) -> bool:
+    for other_words, other_outlet in kept:
+        if words == other_words:
+            return True
+        union = len(words | other_words)
+        overlap = len(words & other_words) / union if union else 1.0
+        # same outlet syndicating to several feeds is a dup at a lower bar
+        if overlap >= NEAR_DUP_JACCARD or (outlet and outlet == other_outlet and overlap >= 0.6):
+            return True
+    return False
+
+def _merge_rows(per_query: list, max_rows: int) -> list:
+    """Round-robin across queries (each feed gets a say), skipping near-duplicate stories."""
+    merged, kept = [], []
+    for tier in range(max((len(r) for r in per_query), default=0)):
+        for rows in per_query:
+            if tier >= len(rows):
+                continue
+            title, link, host = rows[tier]
+            words, outlet = title_words(title), _outlet(title, host)
+            if _is_near_dup(words, outlet, kept):
+                continue
+            kept.append((words, outlet))
+            merged.append(rows[tier])
+            if len(merged) >= max_rows:
+                return merged
+    return merged
+
+def news_headlines_multi(queries: str) -> str:
+    """Headlines for several queries at once, e.g. "NVDA; Nvidia; AI chips" (';'-separated).
+    Feeds are fetched concurrently, merged, and near-identical stories appear once.
+    Returns plain lines "Title | full_link | host"."""
+    try:
+        max_rows, fresh_days = _headline_settings()
+        qs = [q.strip() for q in (queries or "").split(";") if q.strip()][:MULTI_QUERY_MAX]
+        if not qs:
+            return "No headlines found."
+        urls = [_rss_url(q, fresh_days) for q in qs]
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            futures = [pool.submit(_fetch_rows, url, max_rows) for url in urls]
+        per_query = []
+        for fut in futures:
+            try:
+                per_query.append(fut.result())
+            except Exception:
+                per_query.append([])  # one bad feed shouldn't sink the others
+        rows = _merge_rows(per_query, max_rows)
+        return "\n".join(f"{title} | {link} | {host}" for title, link, host in rows) if rows else "No headlines found."
+    except Exception as e:
+        return f"Headline fetch error: {e}"
 
-# 2) LLM (uses GOOGLE_API_KEY from env; no key handling here)
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",   # or "gemini-2.5-flash"
-    temperature=0.2,
-)
+# ------------------------------ LLM / Prompt ------------------------------
 
-# 3) ReAct prompt (include required vars: tools, tool_names, agent_scratchpad, input)
+# 2) ReAct prompt (include required vars: tools, tool_names, agent_scratchpad, input)
 template = """
 You are a precise financial assistant.
 
@@ -154,6 +249,9 @@ Task:
 
 Rules:
 - Do NOT copy/paste tool Observations verbatim.
+- If asked about several tickers, price them with ONE get_stock_prices call, not one call each.
+- For broader coverage, prefer ONE news_headlines_multi call ("TICKER; Company name; sector")
+  over several news_headlines calls.
 - Headlines tool returns plain lines: "Title | full_link | host".
   • Use only Title and host for the bullets ("Title – host").
   • Do NOT include the raw URLs in the Final Answer.
@@ -179,87 +277,356 @@ Input question: {input}
 {agent_scratchpad}
 """
 
-prompt = PromptTemplate.from_template(template)
+# Tool-calling variant (mode="tools"): the model emits structured calls, several per turn,
+# so price and headlines come back in one step instead of two ReAct iterations.
+tools_system = """
+You are a precise financial assistant.
 
-# 4) Agent
-tools = [get_stock_price, news_headlines]
-agent = create_react_agent(llm, tools, prompt=prompt)
+For a ticker question, call get_stock_price AND news_headlines together in your FIRST
+turn; they are independent, so request both at once. Then answer.
 
-# Tip: keep verbose=False in production to avoid printing chain-of-thought
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    verbose=False,
-    handle_parsing_errors=True,
-    return_intermediate_steps=False,
-)
+Answer format (nothing else):
+$<price>
+- <Title 1> – <host 1>
+- <Title 2> – <host 2>
+- <Title 3> – <host 3>
+
+Rules:
+- Headlines tool returns plain lines: "Title | full_link | host". Use only Title and host.
+- Do NOT include raw URLs. If no headlines, write one bullet: "No recent headlines found."
+- For several tickers use ONE get_stock_prices call; for broader coverage prefer ONE
+  news_headlines_multi call ("TICKER; Company name; sector").
+"""
 
-# ------------------------------ Output helpers ------------------------------
-
-PRICE_RE = re.compile(r"^\$\d[\d,]*\.?\d*$")
-
-def format_guard(out_str: str, max_bullets: int) -> str:
-    """Normalize final output: one price line + up to N bullets, no URLs."""
-    lines = [l.strip() for l in (out_str or "").strip().splitlines() if l.strip()]
-    if not lines:
-        return out_str
-
-    # 1) keep only the first valid price line
-    price = next((l for l in lines if PRICE_RE.match(l)), lines[0])
-
-    # 2) collect bullets ("- " prefixed), normalize dash and quotes
-    bullets = []
-    for l in lines:
-        if l.startswith("- "):
-            b = l[2:].strip()
-            b = b.replace(" - ", " – ")  # en dash
-            b = b.replace("’", "'")      # normalize smart quotes
-            bullets.append(b)
-
-    # 3) clamp count
-    if not bullets:
-        bullets = ["No recent headlines found."]
-    bullets = bullets[:max_bullets]
-
-    # 4) rebuild
-    final = [price] + [f"- {b}" for b in bullets]
-    return "\n".join(final)
-
-def to_json(out_str: str) -> str:
-    """Convert the clean output to JSON: {'price': '$x', 'headlines': [{title,host}]}"""
-    lines = [l.strip() for l in (out_str or "").strip().splitlines() if l.strip()]
-    price = lines[0] if lines else ""
-    headlines = []
-    for l in lines[1:]:
-        if l.startswith("- "):
-            txt = l[2:].strip()
-            if " – " in txt:
-                title, host = txt.split(" – ", 1)
-            else:
-                title, host = txt, ""
-            headlines.append({"title": title.strip(), "host": host.strip()})
-    return json.dumps({"price": price, "headlines": headlines}, ensure_ascii=False, indent=2)
+# Structured variant (mode="structured"): same first turn, but the answer is a submit_brief
+# call whose validated arguments become a Brief, instead of text for format_guard to scrape.
+structured_system = """
+You are a precise financial assistant.
+
+For a ticker question, call get_stock_price AND news_headlines together in your FIRST
+turn; they are independent, so request both at once.
+
+Then finish by calling submit_brief exactly once:
+- price: the latest price as a plain number, or null if the price tool failed.
+- headlines: 3–5 items from the headlines tool ("Title | full_link | host" lines),
+  with title, host and url copied from it. Drop a trailing " - Publisher" from titles.
+Do not write the answer as text.
+"""
+
+# 3) Tools + agent (built on first use, then reused for every run)
+
+@lru_cache(maxsize=None)
+def get_tools() -> list:
+    from langchain_core.tools import StructuredTool
+    from agents import quotes
+
+    return [
+        # Sources are raced concurrently over a pooled HTTP client (see agents/quotes.py);
+        # sync invoke and async ainvoke/astream_events both work.
+        StructuredTool.from_function(
+            func=quotes.get_price,
+            coroutine=quotes.aget_price,
+            name="get_stock_price",
+            description="Latest price for a ticker (e.g., NVDA). Races Stooq (with and without .us) and Yahoo.",
+        ),
+        StructuredTool.from_function(
+            func=_stock_prices,
+            coroutine=_astock_prices,
+            name="get_stock_prices",
+            description="Latest prices for several tickers in one call, e.g. 'NVDA, AMD, MSFT'. Returns a TICKER/PRICE/SOURCE table.",
+        ),
+        StructuredTool.from_function(news_headlines),
+        StructuredTool.from_function(news_headlines_multi),
+    ]
+
+@lru_cache(maxsize=None)
+def get_llm() -> "ChatGoogleGenerativeAI":
+    from agents.llm import gemini
+
+    # uses GOOGLE_API_KEY from env; shares the process-wide Gemini rate limiter
+    return gemini(temperature=0.2)
+
+@lru_cache(maxsize=None)
+def get_agent_executor() -> "AgentExecutor":
+    from langchain_core.prompts import PromptTemplate
+    from langchain.agents import AgentExecutor, create_react_agent
+
+    tools = get_tools()
+    prompt = PromptTemplate.from_template(template)
+    agent = create_react_agent(get_llm(), tools, prompt=prompt)
+
+    # Tip: keep verbose=False in production to avoid printing chain-of-thought
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=False,
+        handle_parsing_errors=True,
+        return_intermediate_steps=False,
+        stream_runnable=False,  # steps via invoke, so the LLM cache is checked (agents/llm.py)
+    )
+
+@lru_cache(maxsize=None)
+def get_tool_calling_executor() -> "AgentExecutor":
+    """
+    Same tools, driven by native function calling. When the model asks for several tools
+    in one turn, AgentExecutor's async path runs them concurrently (asyncio.gather) and
+    returns all observations together, so the standard question takes two LLM calls
+    (tools, then answer) instead of three.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain.agents import AgentExecutor, create_tool_calling_agent
+
+    tools = get_tools()
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", tools_system),
+        ("human", "{input}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ])
+    agent = create_tool_calling_agent(get_llm(), tools, prompt)
+    return AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True,
+                         stream_runnable=False)
+
+def _submit_brief(price=None, headlines=()) -> Brief:
+    return Brief(price, tuple(Headline(h.title.strip(), h.host.strip(), h.url.strip()) for h in headlines))
+
+@lru_cache(maxsize=None)
+def get_structured_executor() -> "AgentExecutor":
+    """
+    Tool-calling agent whose last step is a submit_brief call (return_direct): the
+    executor's output is then the Brief itself, built from schema-validated arguments.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.tools import StructuredTool
+    from langchain.agents import AgentExecutor, create_tool_calling_agent
+    from agents.schemas import StockBrief
+
+    submit = StructuredTool.from_function(
+        func=_submit_brief,
+        name="submit_brief",
+        description="Submit the final answer (price + headlines). Call exactly once, last.",
+        args_schema=StockBrief,
+        return_direct=True,
+    )
+    tools = get_tools() + [submit]
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", structured_system),
+        ("human", "{input}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ])
+    agent = create_tool_calling_agent(get_llm(), tools, prompt)
+    return AgentExecutor(agent=agent, tools=tools, verbose=False, handle_parsing_errors=True,
+                         stream_runnable=False)
+
+# ------------------------------ Direct pipeline (no LLM) ------------------------------
+# With ticker/max/fresh already known, the ReAct loop only ever calls get_stock_price and
+# news_headlines and reformats them. mode="direct" does exactly that, concurrently, and
+# builds the same Brief structured mode gets from the model: no Gemini round trips, no quota used.
+
+MODES = ("react", "tools", "structured", "direct")
+BRIEF_MODES = ("structured", "direct")  # modes whose answer is a typed Brief (run_brief)
+
+def _direct_rows(ticker: str, max_rows: int, fresh_days: int) -> list:
+    try:
+        return _fetch_rows(_rss_url(ticker, fresh_days), max_rows)
+    except Exception:
+        return []  # same outcome as the agent seeing "Headline fetch error": no bullets
+
+def _headline(row) -> Headline:
+    # feed links are often news.google.com redirects; the " - Publisher" tag names the outlet
+    title, link, host = row
+    title, publisher = split_publisher(title)
+    return Headline(title, publisher or host, link)
+
+def _direct_brief(quote, rows: list, max_rows: int) -> Brief:
+    note = "" if quote.price is not None else quote.message
+    return Brief(quote.price, tuple(_headline(r) for r in rows[:max_rows]), note)
+
+def brief_direct(ticker: str, max_rows: int, fresh_days: int) -> Brief:
+    from agents import quotes
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        rows = pool.submit(_direct_rows, ticker, max_rows, fresh_days)
+        quote = quotes.get_quote(ticker)  # meanwhile, on the background loop
+        return _direct_brief(quote, rows.result(), max_rows)
+
+def run_direct(ticker: str, max_rows: int, fresh_days: int) -> str:
+    return render_brief(brief_direct(ticker, max_rows, fresh_days))
+
+async def _agather_direct(ticker: str, max_rows: int, fresh_days: int):
+    from agents import quotes
+    return await asyncio.gather(
+        quotes.aget_quote(ticker),
+        asyncio.to_thread(_direct_rows, ticker, max_rows, fresh_days),
+    )
+
+async def abrief_direct(ticker: str, max_rows: int, fresh_days: int) -> Brief:
+    quote, rows = await _agather_direct(ticker, max_rows, fresh_days)
+    return _direct_brief(quote, rows, max_rows)
+
+async def arun_direct(ticker: str, max_rows: int, fresh_days: int) -> str:
+    return render_brief(await abrief_direct(ticker, max_rows, fresh_days))
+
+async def _astream_direct(ticker: str, max_rows: int, fresh_days: int):
+    yield "tool", f"get_stock_price({ticker})"
+    yield "tool", f"news_headlines({ticker})"
+    quote, rows = await _agather_direct(ticker, max_rows, fresh_days)
+    yield "observation", quote.message
+    yield "observation", f"{len(rows)} headline(s)"
+    yield "final", render_brief(_direct_brief(quote, rows, max_rows))
+
+def _check_mode(mode: str):
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}; expected one of {', '.join(MODES)}")
+
+# ------------------------------ Run API ------------------------------
+
+def _clamp(v: int, lo: int, hi: int) -> int:
+    return max(lo, min(int(v), hi))
+
+# get_llm() is cached and the Gemini client binds its grpc.aio channel to the first loop
+# it runs on, so every LLM-driven run goes through the shared background loop
+# (agents/background.py): sync callers block on it, async callers await it. asyncio.run()
+# per call would leave the cached client tied to a closed loop after the first run.
+
+# prices and headlines are time-sensitive: off unless GEMINI_REACT_ANSWER_TTL is set, and
+# then that (short) TTL is the freshness bound; the ticker and options must match exactly
+ANSWERS = AnswerCache.for_agent("gemini_react", ttl=0, volatile=True)
+
+def _goal(ticker: str, max_rows: int, fresh_days: int) -> str:
+    # steer the agent with a clear instruction (it still must use tools)
+    return f"Get {ticker} latest price and {max_rows} recent headlines (fresh={fresh_days}d)."
+
+def _executor(mode: str):
+    if mode == "structured":
+        return get_structured_executor()
+    return get_tool_calling_executor() if mode == "tools" else get_agent_executor()
+
+def _as_text(output, max_rows: int) -> str:
+    # structured mode hands back a Brief: render it; free text still goes through format_guard
+    if isinstance(output, Brief):
+        return render_brief(output, max_rows)
+    return format_guard(str(output or ""), max_rows)
+
+async def _ainvoke(ticker: str, opts: tuple, mode: str):
+    token = _headline_opts.set(opts)
+    try:
+        result = await _executor(mode).ainvoke({"input": _goal(ticker, *opts)})
+    finally:
+        _headline_opts.reset(token)
+    return result.get("output", "")
+
+def run(ticker: str = "NVDA", max: int = HEADLINE_MAX, fresh: int = HEADLINE_FRESH_DAYS,
+        mode: str = "react") -> str:
+    """Price + headlines for `ticker`, already normalized by format_guard.
+    mode="tools" uses the tool-calling agent, "structured" has it submit a typed Brief,
+    "direct" skips the LLM and calls the two tools itself."""
+    _check_mode(mode)
+    opts = (_clamp(max, 1, 5), _clamp(fresh, 1, 7))  # keep within 1..5 / 1..7
+    if mode == "direct":
+        return run_direct(ticker, *opts)
+    if mode in ("tools", "structured"):
+        # the sync executor runs a step's tool calls one by one; the async one gathers them
+        return submit(arun(ticker, max, fresh, mode=mode)).result()
+    goal = _goal(ticker, *opts)
+    cached = ANSWERS.get(goal)
+    if cached is not None:
+        return cached
+    token = _headline_opts.set(opts)
+    try:
+        result = get_agent_executor().invoke({"input": goal})
+    finally:
+        _headline_opts.reset(token)
+    answer = format_guard(result.get("output", ""), opts[0])
+    ANSWERS.put(goal, answer)
+    return answer
+
+async def arun(ticker: str = "NVDA", max: int = HEADLINE_MAX, fresh: int = HEADLINE_FRESH_DAYS,
+               mode: str = "react") -> str:
+    _check_mode(mode)
+    opts = (_clamp(max, 1, 5), _clamp(fresh, 1, 7))
+    if mode == "direct":
+        return await arun_direct(ticker, *opts)
+    goal = _goal(ticker, *opts)
+    cached = ANSWERS.get(goal)
+    if cached is not None:
+        return cached
+    answer = _as_text(await on_loop(_ainvoke(ticker, opts, mode)), opts[0])
+    ANSWERS.put(goal, answer)
+    return answer
+
+async def arun_brief(ticker: str = "NVDA", max: int = HEADLINE_MAX, fresh: int = HEADLINE_FRESH_DAYS,
+                     mode: str = "structured") -> Brief:
+    """The answer as a typed Brief (price, headlines with urls) rather than text."""
+    _check_mode(mode)
+    opts = (_clamp(max, 1, 5), _clamp(fresh, 1, 7))
+    if mode == "direct":
+        return await abrief_direct(ticker, *opts)
+    output = await on_loop(_ainvoke(ticker, opts, mode))
+    if isinstance(output, Brief):
+        return output._replace(headlines=output.headlines[: opts[0]])
+    # the model answered in prose (or a text mode was asked for): fall back to scraping it
+    return brief_from_text(format_guard(str(output or ""), opts[0]))
+
+def run_brief(ticker: str = "NVDA", max: int = HEADLINE_MAX, fresh: int = HEADLINE_FRESH_DAYS,
+              mode: str = "structured") -> Brief:
+    _check_mode(mode)
+    if mode == "direct":
+        return brief_direct(ticker, _clamp(max, 1, 5), _clamp(fresh, 1, 7))
+    return submit(arun_brief(ticker, max, fresh, mode=mode)).result()
+
+async def astream(ticker: str = "NVDA", max: int = HEADLINE_MAX, fresh: int = HEADLINE_FRESH_DAYS,
+                  mode: str = "react"):
+    """Progress events (see agents.streaming); the "final" text is passed through format_guard."""
+    _check_mode(mode)
+    opts = (_clamp(max, 1, 5), _clamp(fresh, 1, 7))
+    events = _astream_direct(ticker, *opts) if mode == "direct" else aiter_on_loop(_astream(ticker, opts, mode))
+    async for event in events:
+        yield event
+
+async def _astream(ticker: str, opts: tuple, mode: str):
+    goal = _goal(ticker, *opts)
+    cached = ANSWERS.get(goal)
+    if cached is not None:
+        yield "final", cached
+        return
+    token = _headline_opts.set(opts)
+    try:
+        # only the ReAct prompt has a "Final Answer:" marker; a Brief output arrives already
+        # rendered (str(Brief)), so the format_guard below just clamps it
+        marker = FINAL_MARKER if mode == "react" else None
+        events = stream_progress(_executor(mode), {"input": goal}, final_marker=marker)
+    finally:
+        _headline_opts.reset(token)
+    async for kind, text in events:
+        if kind == "final":
+            text = format_guard(text, opts[0])
+            ANSWERS.put(goal, text)
+        yield kind, text
 
 # ------------------------------ Main ------------------------------
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--ticker", default="NVDA", help="Ticker symbol to query, e.g., NVDA")
     parser.add_argument("--max", type=int, default=4, help="Max number of headlines (3–5 recommended)")
     parser.add_argument("--fresh", type=int, default=1, help="Recency window in days for headlines (when:<d>)")
     parser.add_argument("--json", action="store_true", help="Also print JSON output")
-    args = parser.parse_args()
-
-    # apply CLI overrides for the headlines tool
-    HEADLINE_MAX = max(1, min(args.max, 5))          # keep within 1..5
-    HEADLINE_FRESH_DAYS = max(1, min(args.fresh, 7)) # keep within 1..7
-
-    # steer the agent with a clear instruction (it still must use tools)
-    goal = f"Get {args.ticker} latest price and {HEADLINE_MAX} recent headlines (fresh={HEADLINE_FRESH_DAYS}d)."
-    result = agent_executor.invoke({"input": goal})
+    parser.add_argument("--mode", choices=MODES, default="react",
+                        help="react: Gemini ReAct agent; tools: tool-calling agent (parallel tool calls); "
+                             "structured: tool-calling agent that returns a typed answer; "
+                             "direct: call both tools concurrently, no LLM")
+    args = parser.parse_args(argv)
+
+    if args.mode in BRIEF_MODES:
+        brief = run_brief(args.ticker, args.max, args.fresh, mode=args.mode)
+        safe_out, as_json = render_brief(brief), brief_to_json(brief)
+    else:
+        safe_out = run(args.ticker, args.max, args.fresh, mode=args.mode)
+        as_json = to_json(safe_out)
 
     print("----Final Result----")
-    safe_out = format_guard(result.get("output", ""), HEADLINE_MAX)
     print(safe_out)
 
     if args.json:
-        print(to_json(safe_out))
+        print(as_json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# agents/llm.py — the one place Gemini chat clients are built
+#
+# Every agent gets its client from gemini(); they all share the process-wide limiter in
+# agents/ratelimit.py. The client's own retry loop (fixed exponential waits, the same
+# for every caller) is turned off: 429s and 503s are retried here, with jittered
+# backoff and retry-after hints, and each retry is re-admitted through the limiter.
+# One client behaviour survives max_retries: on a 429 whose exception carries a
+# retry_after under CLIENT_HINT_MAX seconds it sleeps that long before re-raising, and
+# that cannot be switched off from outside. Such a hint counts as already served here.
+# With LLM_CACHE=1 they also share the persistent response cache (agents/llm_cache.py);
+# AgentExecutors built on these clients pass stream_runnable=False: chat-model streaming
+# never consults the cache, while invoked steps check it first and still stream tokens
+# under astream_events (through the streaming callback).
+
+import asyncio
+import itertools
+import os
+import time
+
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from agents.llm_cache import get_llm_cache
+from agents.ratelimit import UsageCallback, get_limiter
+
+MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS", "5"))
+
+RETRYABLE = (ResourceExhausted, ServiceUnavailable)
+CLIENT_HINT_MAX = 60.0  # the client's wait_exponential_max: shorter retry_after hints it sleeps itself
+
+def _client_waited(exc: Exception) -> float:
+    """Seconds the client already slept on this exception's retry_after before re-raising."""
+    hint = getattr(exc, "retry_after", None) if isinstance(exc, ResourceExhausted) else None
+    try:
+        hint = float(hint)
+    except (TypeError, ValueError):
+        return 0.0
+    return hint if 0 < hint < CLIENT_HINT_MAX else 0.0
+
+
+class RateLimitedGemini(ChatGoogleGenerativeAI):
+    """ChatGoogleGenerativeAI whose retries go through the shared limiter."""
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> float:
+        if attempt + 1 >= MAX_ATTEMPTS:
+            raise exc
+        return self.rate_limiter.on_rate_limited(exc, attempt, waited=_client_waited(exc))
+
+    def _generate(self, *args, **kwargs):
+        for attempt in itertools.count():
+            try:
+                return super()._generate(*args, **kwargs)
+            except RETRYABLE as e:
+                time.sleep(self._retry_delay(e, attempt))
+                self.rate_limiter.acquire()
+
+    async def _agenerate(self, *args, **kwargs):
+        for attempt in itertools.count():
+            try:
+                return await super()._agenerate(*args, **kwargs)
+            except RETRYABLE as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                await self.rate_limiter.aacquire()
+
+    # streams are only retried before their first chunk; after that the caller has output
+    def _stream(self, *args, **kwargs):
+        for attempt in itertools.count():
+            started = False
+            try:
+                for chunk in super()._stream(*args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except RETRYABLE as e:
+                if started:
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+                self.rate_limiter.acquire()
+
+    async def _astream(self, *args, **kwargs):
+        for attempt in itertools.count():
+            started = False
+            try:
+                async for chunk in super()._astream(*args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except RETRYABLE as e:
+                if started:
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                await self.rate_limiter.aacquire()
+
+
+def gemini(temperature: float, model: str = MODEL) -> ChatGoogleGenerativeAI:
+    """A Gemini chat client (GOOGLE_API_KEY from env) behind the shared rate limiter."""
+    limiter = get_limiter()
+    return RateLimitedGemini(
+        model=model,
+        temperature=temperature,
+        cache=get_llm_cache(),  # None: no caching unless LLM_CACHE=1
+        rate_limiter=limiter,
+        callbacks=[UsageCallback(limiter)],
+        max_retries=1,  # one attempt: the client's tenacity loop never retries; see module notes
+    )
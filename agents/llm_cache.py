@@ -0,0 +1,121 @@
+# agents/llm_cache.py — opt-in persistent cache for Gemini responses
+#
+# A LangChain BaseCache on SQLite. Entries are keyed by a hash of the model's llm_string
+# (model name, temperature and every other call parameter, including bound tools) plus
+# the full serialized prompt, so only byte-identical requests share an answer. Entries
+# older than LLM_CACHE_TTL are dropped on read (and swept every EVICT_EVERY writes); each
+# insert evicts the least recently used rows beyond LLM_CACHE_MAX, so the bound is exact.
+#
+# Off unless LLM_CACHE=1. Hits are answered before the rate limiter is consulted, so
+# repeated demo/regression prompts cost no quota. Tools still run live; only model
+# turns are replayed, and a turn whose prompt includes fresh observations is a new key.
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", ROOT / ".cache" / "llm_cache.sqlite"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))  # seconds
+CACHE_MAX = int(os.getenv("LLM_CACHE_MAX", "2000"))     # entries
+EVICT_EVERY = 32  # writes between sweeps of expired entries
+
+CACHED_FLAG = "llm_cache_hit"  # set in generation_info on replayed generations
+
+# "core": only langchain_core classes (generations, messages) are rebuilt. The keyword
+# arrived in langchain-core 0.3.81; older cores already restrict loads() to langchain's
+# own namespaces by default, so they get no keyword rather than a TypeError on every hit.
+_LOAD_KWARGS = {"allowed_objects": "core"} if "allowed_objects" in inspect.signature(loads).parameters else {}
+
+
+class SQLiteLLMCache(BaseCache):
+    def __init__(self, path: Path = CACHE_PATH, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        # one connection shared by threads (serialized by the lock); WAL lets worker
+        # processes read while another writes
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_used ON llm_cache (used)")
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[list]:
+        key, now = self._key(prompt, llm_string), time.time()
+        with self._lock, self._db:
+            row = self._db.execute("SELECT value, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE llm_cache SET used = ? WHERE key = ?", (now, key))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", LangChainBetaWarning)
+            generations = [loads(g, **_LOAD_KWARGS) for g in json.loads(row[0])]
+        for g in generations:
+            g.generation_info = {**(g.generation_info or {}), CACHED_FLAG: True}
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: list):
+        value = json.dumps([dumps(g) for g in return_val])
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created, used) VALUES (?, ?, ?, ?)",
+                (self._key(prompt, llm_string), value, now, now),
+            )
+            self._trim()
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._db.execute("DELETE FROM llm_cache WHERE created < ?", (now - self.ttl,))
+
+    def _trim(self):
+        # normally deletes nothing, or the one row the insert pushed over the bound;
+        # counted in SQL so rows written by other worker processes are included
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY used"
+            " LIMIT MAX(0, (SELECT COUNT(*) FROM llm_cache) - ?))",
+            (self.max_entries,),
+        )
+
+    def clear(self, **kwargs):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM llm_cache")
+
+    def size(self) -> int:
+        # not __len__: LangChain tests `if self.cache`, and an empty cache must stay truthy
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """The shared cache when LLM_CACHE=1, else None (no caching)."""
+    if os.getenv("LLM_CACHE") != "1":
+        return None
+    return SQLiteLLMCache()
@@ -0,0 +1,649 @@
+# agents/llm_compiler.py — Task Fetching Unit for the LLMCompiler notebook (07_1_llm_compiler.ipynb)
+#
+# The planner streams tasks ({idx, tool, args, dependencies}); schedule_tasks runs each
+# one on a thread pool the moment its last dependency has an observation. A DAGScheduler
+# counts unmet dependencies per task and, when a task finishes, decrements its
+# dependents and dispatches the ones that reach zero from the finishing thread: no
+# thread sleeps waiting for a dependency and there is no polling interval per DAG level
+# (the notebook version re-checked every 0.25 s, holding a pool thread per waiting task).
+#
+# Tasks may name a dependency that has not streamed in yet; it is counted like any
+# other and released when that task completes. A PlanAnalyzer checks the plan as it
+# streams: a task closing a dependency cycle (or reusing an idx) is rejected, and when
+# the stream ends, tasks still waiting on a task the plan never defined are failed,
+# so a bad plan yields ERROR observations for the joiner instead of hanging. When more
+# tasks are ready than there are slots, the one heading the longest remaining chain of
+# dependents runs first. Each task's args are compiled into a $N template when it is
+# admitted and rendered in one pass once its dependencies are in; a bare "$N" argument
+# receives the observation itself rather than its str(). Results go to an ObservationStore
+# (atomic first-write-wins publish, lock-free reads, waiters, snapshots) rather than a
+# dict shared on the assumption that no two tasks write the same key.
+#
+# schedule_tasks / plan_and_schedule also run natively on asyncio (ainvoke, astream): the
+# plan streams from planner.stream on a worker thread (the notebook's parser has no
+# async transform), ready tools start as asyncio tasks through
+# their ainvoke, and at most LLM_COMPILER_CONCURRENCY tool calls are in flight per plan
+# (also the thread pool's size).
+
+import asyncio
+import itertools
+import os
+import re
+import threading
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
+
+from langchain_core.messages import BaseMessage, FunctionMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
+from pydantic import ValidationError
+from typing_extensions import TypedDict
+
+ID_PATTERN = r"\$\{?(\d+)\}?"  # $1 or ${1} -> 1
+_ID_RE = re.compile(ID_PATTERN)
+MAX_IN_FLIGHT = int(os.getenv("LLM_COMPILER_CONCURRENCY", "8"))  # tool calls at once per plan
+
+
+class Task(TypedDict):
+    # what the notebook's LLMCompilerPlanParser yields (math_tools/output_parser helpers)
+    idx: int
+    tool: Union[BaseTool, str]  # "join" for the final pseudo-task
+    args: Any
+    dependencies: List[int]
+    thought: Optional[str]
+
+
+class SchedulerInput(TypedDict):
+    messages: List[BaseMessage]
+    tasks: Iterable[Task]
+
+
+class ObservationStore:
+    """
+    Task observations keyed by idx, shared by scheduler threads/tasks and the tools
+    resolving $N arguments.
+
+    publish() is atomic and first-write-wins (a duplicate idx cannot overwrite a result
+    others already read) and wakes anything waiting on that idx. Reads (get, `in`) take
+    no lock: a dict lookup is atomic, so hundreds of concurrent resolvers never contend
+    with publishers. snapshot() is a consistent copy for the joiner / message building.
+    """
+
+    def __init__(self, initial: Optional[Dict[int, Any]] = None):
+        self._values: Dict[int, Any] = dict(initial or {})
+        self.baseline = frozenset(self._values)  # observed before this plan (re-planning)
+        self._lock = threading.Lock()
+        self._waiters: Dict[int, List] = defaultdict(list)  # idx -> callbacks(value)
+        self._texts: Dict[int, str] = {}                    # idx -> str(value), on first use
+
+    @classmethod
+    def from_messages(cls, messages: List[BaseMessage]) -> "ObservationStore":
+        """Observations of earlier plans, from their FunctionMessages (latest wins)."""
+        return cls({
+            int(m.additional_kwargs["idx"]): m.content for m in messages if isinstance(m, FunctionMessage)
+        })
+
+    def __contains__(self, idx: int) -> bool:
+        return idx in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, idx: int, default: Any = None) -> Any:
+        return self._values.get(idx, default)
+
+    def text(self, idx: int, default: str) -> str:
+        """str() of an observation, computed once however many tasks substitute it."""
+        cached = self._texts.get(idx)
+        if cached is None:
+            if idx not in self._values:
+                return default
+            cached = self._texts[idx] = str(self._values[idx])  # racing writers store equal strings
+        return cached
+
+    def publish(self, idx: int, value: Any) -> bool:
+        """Record task idx's observation; False (and ignored) if it already has one."""
+        with self._lock:
+            if idx in self._values:
+                return False
+            self._values[idx] = value
+            callbacks = self._waiters.pop(idx, ())
+        for cb in callbacks:
+            cb(value)
+        return True
+
+    def subscribe(self, idx: int, callback):
+        """Call callback(value) once idx is published (right away if it already is)."""
+        with self._lock:
+            if idx not in self._values:
+                self._waiters[idx].append(callback)
+                return
+        callback(self._values[idx])
+
+    def wait(self, idx: int, timeout: Optional[float] = None) -> Any:
+        """Block until idx is published; raises TimeoutError after `timeout` seconds."""
+        done = threading.Event()
+        self.subscribe(idx, lambda _: done.set())
+        if not done.wait(timeout):
+            raise TimeoutError(f"no observation for task {idx}")
+        return self._values[idx]
+
+    async def await_(self, idx: int) -> Any:
+        """Async wait for idx; safe to publish from other threads."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+
+        def _set(value):
+            loop.call_soon_threadsafe(lambda: fut.done() or fut.set_result(value))
+
+        self.subscribe(idx, _set)
+        return await fut
+
+    def snapshot(self) -> Dict[int, Any]:
+        with self._lock:
+            return dict(self._values)
+
+    def new(self) -> List[tuple]:
+        """(idx, observation) published during this plan, in idx order."""
+        snap = self.snapshot()
+        return sorted((k, v) for k, v in snap.items() if k not in self.baseline)
+
+
+ArgRenderer = Callable[..., Any]  # (observations, as_text=False) -> resolved args
+
+
+def _constant(value: Any) -> ArgRenderer:
+    return lambda observations, as_text=False: value
+
+
+def compile_args(args: Any) -> ArgRenderer:
+    """
+    Pre-parse a task's args once, at plan time, into a renderer run when its
+    dependencies are observed. "$N" / "${N}" alone is replaced by task N's observation
+    as is (type kept, no copy), or by its text with as_text=True; inside other text by
+    its str(), memoized per observation; a reference with no observation is left as
+    written. Lists, tuples and dict values are rendered element-wise; any other value
+    passes through unchanged.
+    """
+    if isinstance(args, str):
+        parts, pos = [], 0
+        for m in _ID_RE.finditer(args):
+            if m.start() > pos:
+                parts.append(args[pos:m.start()])
+            parts.append((int(m.group(1)), m.group(0)))
+            pos = m.end()
+        if not parts:
+            return _constant(args)
+        if pos < len(args):
+            parts.append(args[pos:])
+        if len(parts) == 1:
+            idx, text = parts[0]
+            return lambda observations, as_text=False: (
+                observations.text(idx, text) if as_text else observations.get(idx, text)
+            )
+        parts = tuple(parts)
+        return lambda observations, as_text=False: "".join(
+            p if isinstance(p, str) else observations.text(p[0], p[1]) for p in parts
+        )
+    if isinstance(args, (list, tuple)):
+        items = [compile_args(a) for a in args]
+        kind = tuple if isinstance(args, tuple) else list
+        return lambda observations, as_text=False: kind(f(observations, as_text) for f in items)
+    if isinstance(args, dict):
+        items = {key: compile_args(val) for key, val in args.items()}
+        return lambda observations, as_text=False: {key: f(observations, as_text) for key, f in items.items()}
+    return _constant(args)
+
+
+def _unresolved_error(tool: BaseTool, args: Any, e: Exception) -> str:
+    return (
+        f"ERROR(Failed to call {tool.name} with args {args}.)"
+        f" Args could not be resolved. Error: {repr(e)}"
+    )
+
+
+def _call_error(tool: BaseTool, args: Any, resolved_args: Any, e: Exception) -> str:
+    return (
+        f"ERROR(Failed to call {tool.name} with args {args}."
+        + f" Args resolved to {resolved_args}. Error: {repr(e)})"
+    )
+
+
+def _execute_task(task: Task, observations: ObservationStore, config: Optional[RunnableConfig],
+                  render: Optional[ArgRenderer] = None):
+    tool_to_use = task["tool"]
+    if isinstance(tool_to_use, str):
+        return tool_to_use
+    render = render or compile_args(task["args"])
+    try:
+        resolved_args = render(observations)
+    except Exception as e:
+        return _unresolved_error(tool_to_use, task["args"], e)
+    try:
+        try:
+            return tool_to_use.invoke(resolved_args, config)
+        except ValidationError:
+            # the schema wants text where a structured observation was passed as is
+            resolved_args = render(observations, as_text=True)
+            return tool_to_use.invoke(resolved_args, config)
+    except Exception as e:
+        return _call_error(tool_to_use, task["args"], resolved_args, e)
+
+
+async def _aexecute_task(task: Task, observations: ObservationStore, config: Optional[RunnableConfig],
+                         render: Optional[ArgRenderer] = None):
+    tool_to_use = task["tool"]
+    if isinstance(tool_to_use, str):
+        return tool_to_use
+    render = render or compile_args(task["args"])
+    try:
+        resolved_args = render(observations)
+    except Exception as e:
+        return _unresolved_error(tool_to_use, task["args"], e)
+    try:
+        try:
+            return await tool_to_use.ainvoke(resolved_args, config)
+        except ValidationError:
+            resolved_args = render(observations, as_text=True)
+            return await tool_to_use.ainvoke(resolved_args, config)
+    except Exception as e:
+        return _call_error(tool_to_use, task["args"], resolved_args, e)
+
+
+def _schedule_task(task_inputs, config):
+    try:
+        return _execute_task(task_inputs["task"], task_inputs["observations"], config, task_inputs.get("render"))
+    except Exception:
+        return traceback.format_exc()
+
+
+async def _aschedule_task(task_inputs, config):
+    try:
+        return await _aexecute_task(
+            task_inputs["task"], task_inputs["observations"], config, task_inputs.get("render")
+        )
+    except Exception:
+        return traceback.format_exc()
+
+
+# one task whose dependencies are all observed -> its observation (a traced step per task)
+schedule_task = RunnableLambda(_schedule_task, afunc=_aschedule_task, name="schedule_task")
+
+
+class PlanAnalyzer:
+    """
+    Incremental checks on a plan as it streams in, and each task's critical path.
+
+    add() rejects a duplicate idx, a self-dependency, or a task that closes a cycle; a
+    cycle needs a forward reference (a dependency on a task not streamed in yet), so
+    the search only runs when the new task was already referenced. Dependencies still
+    unseen when the stream ends are in missing(). height[idx] is the length of the
+    longest known chain of tasks waiting on idx, counting idx itself.
+    """
+
+    def __init__(self, observed: Iterable[int] = ()):
+        self.observed = frozenset(observed)  # results of earlier plans
+        self.deps: Dict[int, List[int]] = {}
+        self.dependents: Dict[int, set] = defaultdict(set)
+        self.height: Dict[int, int] = {}
+        self._forward: Dict[int, set] = defaultdict(set)  # unseen idx -> tasks waiting on it
+
+    def add(self, task: Task) -> Optional[str]:
+        """None if the task was accepted, else why it was rejected."""
+        idx = task["idx"]
+        if idx in self.deps or idx in self.observed:
+            return f"duplicate task index {idx}"
+        deps = [d for d in dict.fromkeys(task["dependencies"]) if d not in self.observed]
+        if idx in deps:
+            return f"task {idx} depends on itself"
+        if idx in self._forward:
+            cycle = self._path(deps, idx)
+            if cycle:
+                return "dependency cycle: " + " -> ".join(map(str, [idx, *cycle]))
+        self._forward.pop(idx, None)
+        self.deps[idx] = deps
+        self.height[idx] = 1 + max((self.height[c] for c in self.dependents.get(idx, ())), default=0)
+        for d in deps:
+            self.dependents[d].add(idx)
+            if d not in self.deps:
+                self._forward[d].add(idx)
+        self._raise(idx)
+        return None
+
+    def _path(self, starts: List[int], target: int) -> Optional[List[int]]:
+        # a dependency path from one of `starts` to `target`, over tasks seen so far
+        stack, seen = [(d, [d]) for d in starts], set()
+        while stack:
+            node, path = stack.pop()
+            if node == target:
+                return path
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.extend((d, path + [d]) for d in self.deps.get(node, ()))
+        return None
+
+    def _raise(self, idx: int):
+        # a new task lengthens the chains through everything it depends on
+        stack = [idx]
+        while stack:
+            node = stack.pop()
+            for d in self.deps.get(node, ()):
+                if d in self.height and self.height[d] < self.height[node] + 1:
+                    self.height[d] = self.height[node] + 1
+                    stack.append(d)
+
+    def missing(self) -> Dict[int, set]:
+        """Dependencies never streamed in -> the tasks waiting on them."""
+        return {d: set(ts) for d, ts in self._forward.items()}
+
+
+class _DependencyCounter:
+    """
+    Bookkeeping shared by both schedulers: unmet dependency counts per blocked task,
+    and a ready list served longest-remaining-chain first (PlanAnalyzer.height), so
+    when slots are scarce the tasks gating the most downstream work go first.
+    """
+
+    def __init__(self, observations: ObservationStore, config: Optional[RunnableConfig]):
+        self.observations = observations
+        self.config = config
+        self.analyzer = PlanAnalyzer(observations.baseline)
+        self._blocked: Dict[int, tuple] = {}                        # idx -> (task, unmet dep count)
+        self._dependents: Dict[int, List[int]] = defaultdict(list)  # dep idx -> blocked idxs
+        self._ready: List[Task] = []
+        self._running = 0  # ready + executing
+        self._renderers: Dict[int, ArgRenderer] = {}  # idx -> compiled args
+
+    def _admit(self, task: Task) -> List[Task]:
+        """Check, then park or ready `task`; returns tasks ready to dispatch."""
+        if task["idx"] in self.analyzer.deps or task["idx"] in self.observations:
+            return []  # duplicate idx: the first definition (or earlier result) stands
+        problem = self.analyzer.add(task)
+        if problem:
+            return self._reject(task["idx"], problem)
+        if not isinstance(task["tool"], str):
+            self._renderers[task["idx"]] = compile_args(task["args"])  # once, at plan time
+        unmet = {d for d in task["dependencies"] if d not in self.observations}
+        if unmet:
+            self._blocked[task["idx"]] = (task, len(unmet))
+            for dep in unmet:
+                self._dependents[dep].append(task["idx"])
+            return []
+        self._running += 1
+        return [task]
+
+    def _reject(self, idx: int, problem: str) -> List[Task]:
+        # the task never runs; its error stands in as the observation dependents receive
+        self._running += 1
+        return self._complete(idx, f"ERROR(Task {idx} was not run: {problem})")
+
+    def _complete(self, idx: int, observation: Any) -> List[Task]:
+        """Publish an observation; returns the tasks it unblocked (already counted as running)."""
+        self.observations.publish(idx, observation)
+        ready = []
+        for dependent in self._dependents.pop(idx, ()):
+            entry = self._blocked.get(dependent)
+            if entry is None:  # rejected at the end of the plan
+                continue
+            task, unmet = entry
+            if unmet == 1:
+                del self._blocked[dependent]
+                ready.append(task)
+            else:
+                self._blocked[dependent] = (task, unmet - 1)
+        self._running += len(ready) - 1
+        return ready
+
+    def _close(self) -> List[Task]:
+        """Plan stream ended: fail tasks waiting on dependencies that never arrived."""
+        ready = []
+        for dep, waiting in sorted(self.analyzer.missing().items()):
+            if dep in self.observations:
+                continue
+            for idx in sorted(waiting):
+                if self._blocked.pop(idx, None) is not None:
+                    ready += self._reject(idx, f"depends on task {dep}, which the plan never defined")
+        return ready
+
+    def _inputs(self, task: Task) -> dict:
+        return {"task": task, "observations": self.observations, "render": self._renderers.pop(task["idx"], None)}
+
+    def _pop_ready(self) -> Task:
+        best = max(range(len(self._ready)),
+                   key=lambda i: (self.analyzer.height.get(self._ready[i]["idx"], 1), -self._ready[i]["idx"]))
+        return self._ready.pop(best)
+
+
+class DAGScheduler(_DependencyCounter):
+    """
+    Dependency-counting executor on a thread pool. submit() tasks in plan order
+    (dependencies may refer to tasks submitted later), then close() when the plan is
+    complete; wait() returns once every task has finished or been rejected.
+    Observations are published to the given store, keyed by task idx.
+    """
+
+    def __init__(self, observations: ObservationStore, config: Optional[RunnableConfig] = None,
+                 max_workers: int = MAX_IN_FLIGHT):
+        super().__init__(observations, config)
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="llm-compiler")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def _dispatch(self, ready: List[Task]):
+        # lock held: queue the tasks; each pool job takes the best ready task when it starts
+        self._ready.extend(ready)
+        for _ in ready:
+            self._pool.submit(self._next)
+        if not self._running:
+            self._idle.notify_all()
+
+    def submit(self, task: Task):
+        with self._lock:
+            self._dispatch(self._admit(task))
+
+    def close(self):
+        with self._lock:
+            self._dispatch(self._close())
+
+    def _next(self):
+        with self._lock:
+            task = self._pop_ready()
+        try:
+            observation = schedule_task.invoke(self._inputs(task), self.config)
+        except Exception:  # e.g. a failing callback handler; the task still counts as done
+            observation = traceback.format_exc()
+        with self._lock:
+            self._dispatch(self._complete(task["idx"], observation))
+
+    def wait(self):
+        with self._idle:
+            while self._running:
+                self._idle.wait()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class AsyncDAGScheduler(_DependencyCounter):
+    """
+    The same on the running event loop: ready tasks become asyncio tasks calling the
+    tool's ainvoke, at most `max_concurrency` at once (the rest wait in the ready list,
+    longest chain first). submit() never blocks, so the caller keeps consuming the plan
+    stream meanwhile.
+    """
+
+    def __init__(self, observations: ObservationStore, config: Optional[RunnableConfig] = None,
+                 max_concurrency: int = MAX_IN_FLIGHT):
+        super().__init__(observations, config)
+        self.max_concurrency = max(1, max_concurrency)
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks: set = set()  # strong refs until done
+
+    def _dispatch(self, ready: List[Task]):
+        self._ready.extend(ready)
+        while self._ready and self._in_flight < self.max_concurrency:
+            self._in_flight += 1
+            t = asyncio.create_task(self._run(self._pop_ready()))
+            self._tasks.add(t)
+            t.add_done_callback(self._tasks.discard)
+        if self._running:
+            self._idle.clear()
+        else:
+            self._idle.set()
+
+    def submit(self, task: Task):
+        self._dispatch(self._admit(task))
+
+    def close(self):
+        self._dispatch(self._close())
+
+    async def _run(self, task: Task):
+        try:
+            observation = await schedule_task.ainvoke(self._inputs(task), self.config)
+        except Exception:
+            observation = traceback.format_exc()
+        self._in_flight -= 1
+        self._dispatch(self._complete(task["idx"], observation))
+
+    async def wait(self):
+        await self._idle.wait()
+
+    def cancel(self):
+        for t in self._tasks:
+            t.cancel()
+
+
+def _tool_messages(observations: ObservationStore, task_names: dict, args_for_tasks: dict) -> List[FunctionMessage]:
+    # Convert this plan's observations to new tool messages to add to the state
+    return [
+        FunctionMessage(
+            name=task_names[k],
+            content=str(obs),
+            additional_kwargs={"idx": k, "args": args_for_tasks[k]},
+            tool_call_id=k,
+        )
+        for k, obs in observations.new()
+    ]
+
+
+def _record(task: Task, task_names: dict, args_for_tasks: dict):
+    # first definition wins, like the observation (a duplicate idx is rejected)
+    if task["idx"] not in task_names:
+        task_names[task["idx"]] = task["tool"] if isinstance(task["tool"], str) else task["tool"].name
+        args_for_tasks[task["idx"]] = task["args"]
+
+
+def _schedule_tasks(scheduler_input: SchedulerInput, config) -> List[FunctionMessage]:
+    # If we are re-planning, we may have calls that depend on previous plans. Start with those.
+    observations = ObservationStore.from_messages(scheduler_input["messages"])
+    task_names, args_for_tasks = {}, {}
+    scheduler = DAGScheduler(observations, config)
+    try:
+        for task in scheduler_input["tasks"]:
+            _record(task, task_names, args_for_tasks)
+            scheduler.submit(task)
+        # All tasks have been submitted; fail any left waiting on tasks that never came
+        scheduler.close()
+        scheduler.wait()
+    finally:
+        scheduler.shutdown()
+    return _tool_messages(observations, task_names, args_for_tasks)
+
+
+async def _aschedule_tasks(scheduler_input: SchedulerInput, config) -> List[FunctionMessage]:
+    observations = ObservationStore.from_messages(scheduler_input["messages"])
+    task_names, args_for_tasks = {}, {}
+    scheduler = AsyncDAGScheduler(observations, config)
+    tasks = scheduler_input["tasks"]
+    if not hasattr(tasks, "__aiter__"):
+        tasks = _aiter(tasks)
+    try:
+        # tools start while the planner is still streaming the rest of the plan
+        async for task in tasks:
+            _record(task, task_names, args_for_tasks)
+            scheduler.submit(task)
+        scheduler.close()
+        await scheduler.wait()
+    finally:
+        scheduler.cancel()  # no-op unless the plan stream failed midway
+    return _tool_messages(observations, task_names, args_for_tasks)
+
+
+async def _aiter(iterable: Iterable) -> AsyncIterator:
+    for item in iterable:
+        yield item
+
+
+_END = object()
+
+
+async def _stream_in_thread(runnable: Runnable, inputs: Any, config: Optional[RunnableConfig]) -> AsyncIterator:
+    """
+    runnable.stream() on a worker thread, each item handed to the loop as it arrives.
+    Used for the planner rather than astream(): the notebook's LLMCompilerPlanParser
+    only implements the sync _transform, and BaseTransformOutputParser's async fallback
+    parses every token chunk on its own (empty lists / parse errors instead of Tasks).
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def produce():
+        error = None
+        try:
+            for item in runnable.stream(inputs, config):
+                if stop.is_set():
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except BaseException as e:
+            error = e
+        if not stop.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, (_END, error))
+
+    threading.Thread(target=produce, name="llm-compiler-planner", daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, tuple) and item and item[0] is _END:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            yield item
+    finally:
+        stop.set()  # consumer gone: the producer drops the rest of the plan
+
+
+# Group the tasks into a DAG schedule: invoke() runs them on threads, ainvoke() on the loop
+schedule_tasks = RunnableLambda(_schedule_tasks, afunc=_aschedule_tasks, name="schedule_tasks")
+
+
+def make_plan_and_schedule(planner: Runnable) -> Runnable:
+    """
+    The notebook's plan_and_schedule node for a given planner. Called async (ainvoke,
+    or the graph's ainvoke/astream), it streams the plan on a worker thread and
+    schedules tasks on the loop as they arrive, so planning and tool execution overlap.
+    """
+
+    def plan_and_schedule(state, config):
+        messages = state["messages"]
+        tasks = planner.stream(messages, config)
+        # Begin executing the planner immediately
+        try:
+            tasks = itertools.chain([next(tasks)], tasks)
+        except StopIteration:
+            # Handle the case where tasks is empty.
+            tasks = iter([])
+        return {"messages": schedule_tasks.invoke({"messages": messages, "tasks": tasks}, config)}
+
+    async def aplan_and_schedule(state, config):
+        messages = state["messages"]
+        tasks = _stream_in_thread(planner, messages, config)
+        scheduled = await schedule_tasks.ainvoke({"messages": messages, "tasks": tasks}, config)
+        return {"messages": scheduled}
+
+    return RunnableLambda(plan_and_schedule, afunc=aplan_and_schedule, name="plan_and_schedule")
@@ -0,0 +1,328 @@
+# agents/quotes.py — latest-price lookups for the stock agent (Stooq, Yahoo fallback)
+#
+# All sources are raced concurrently: both Stooq symbols ('nvda' and 'nvda.us') and
+# Yahoo start together, the first valid price wins and the rest are cancelled.
+# HTTP goes through one pooled httpx.AsyncClient that lives on the shared background loop
+# (agents/background.py), so sync callers (the ReAct tool) and async callers share
+# keep-alive connections.
+#
+# Results are cached per ticker: fresh for QUOTES_TTL seconds, then served stale for up
+# to QUOTES_STALE more seconds while one background refresh runs. Cache state is only
+# touched on the background loop, so it needs no locks.
+
+import asyncio
+import os
+import time
+from typing import NamedTuple, Optional
+
+import httpx
+
+from agents.background import submit
+
+# Latest-quote endpoint: one header line + one row, instead of the full daily history
+# (/q/d/l/?i=d) that used to be downloaded and parsed with pandas for a single float.
+STOOQ_URL = "https://stooq.com/q/l/?s={sym}&f=sd2t2ohlcv&h&e=csv"
+TIMEOUT = 10  # seconds per source
+
+CACHE_TTL = float(os.getenv("QUOTES_TTL", "60"))      # seconds a price counts as fresh
+CACHE_STALE = float(os.getenv("QUOTES_STALE", "300"))  # extra seconds it may be served stale
+CACHE_MAX = 1024                                       # tickers kept; oldest evicted first
+
+class Quote(NamedTuple):
+    ticker: str
+    price: Optional[float]  # None when every source failed
+    source: str             # e.g. "Stooq NVDA.US", "Yahoo"; "" on failure
+    message: str            # the tool's one-line answer
+
+# ------------------------------ Shared client ------------------------------
+
+_client: Optional[httpx.AsyncClient] = None
+
+def _http() -> httpx.AsyncClient:
+    """The pooled client; only touched from the background loop."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+# ------------------------------ Sources ------------------------------
+
+def _parse_stooq_quote(text: str) -> Optional[float]:
+    """
+    Close from a Stooq quote CSV:
+      Symbol,Date,Time,Open,High,Low,Close,Volume
+      NVDA.US,2025-01-02,22:00:09,136,138.88,134.63,138.31,198247166
+    Unknown symbols come back with 'N/D' fields.
+    """
+    lines = text.strip().splitlines()
+    if len(lines) < 2:
+        return None
+    header = [h.strip() for h in lines[0].split(",")]
+    row = [v.strip() for v in lines[-1].split(",")]
+    if "Close" not in header or len(row) != len(header):
+        return None
+    try:
+        return float(row[header.index("Close")])
+    except ValueError:  # 'N/D'
+        return None
+
+async def _stooq(t: str, sym: str) -> Optional[Quote]:
+    try:
+        resp = await _http().get(STOOQ_URL.format(sym=sym))
+        last = _parse_stooq_quote(resp.text) if resp.is_success else None
+        if last is not None:
+            label = f"Stooq {sym.upper()}"
+            return Quote(t, last, label, f"The latest price of {t} is ${last:.2f} ({label}).")
+    except Exception:
+        # another source may still answer
+        pass
+    return None
+
+def _yahoo_sync(t: str) -> Optional[Quote]:
+    import yfinance as yf
+
+    fast = getattr(yf.Ticker(t), "fast_info", None)
+    if fast:
+        last = getattr(fast, "last_price", None) or (fast.get("last_price") if isinstance(fast, dict) else None)
+        if last:
+            return Quote(t, float(last), "Yahoo", f"The latest price of {t} is ${float(last):.2f} (Yahoo).")
+    # backup: small historical window
+    hist = yf.download(t, period="5d", interval="1d", progress=False)
+    if not hist.empty:
+        last = float(hist["Close"].iloc[-1])
+        return Quote(t, last, "Yahoo", f"Recent close for {t} is ${last:.2f} (Yahoo).")
+    return None
+
+async def _yahoo(t: str) -> Optional[Quote]:
+    # yfinance is blocking; it runs on a thread and simply finishes in the background if it loses
+    return await asyncio.to_thread(_yahoo_sync, t)
+
+# ------------------------------ Race ------------------------------
+
+async def _race(t: str) -> Quote:
+    # Stooq needs '.us' for US tickers, but try both
+    tasks = [asyncio.ensure_future(_stooq(t, sym)) for sym in (t.lower(), f"{t.lower()}.us")]
+    tasks.append(asyncio.ensure_future(_yahoo(t)))
+    yahoo_error = None
+    try:
+        for fut in asyncio.as_completed(tasks):
+            try:
+                quote = await fut
+            except Exception as e:
+                yahoo_error = e  # Stooq swallows its own errors, so this is Yahoo's
+                continue
+            if quote:
+                return quote
+    finally:
+        for task in tasks:
+            task.cancel()
+    if yahoo_error is not None:
+        return Quote(t, None, "", f"Price lookup error for {t}: {yahoo_error}")
+    return Quote(t, None, "", f"No price data returned for {t}. Try later or another ticker.")
+
+# ------------------------------ Cache ------------------------------
+
+_cache: dict[str, tuple[Quote, float]] = {}   # ticker -> (quote, fetched_at monotonic)
+_inflight: dict[str, asyncio.Future] = {}     # ticker -> running fetch (single-flight)
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+def _store(quote: Quote) -> Quote:
+    if quote.price is None:
+        _stats["errors"] += 1  # failures are not cached; the next call tries again
+    else:
+        _cache.pop(quote.ticker, None)
+        _cache[quote.ticker] = (quote, time.monotonic())
+        while len(_cache) > CACHE_MAX:
+            _cache.pop(next(iter(_cache)))
+    return quote
+
+async def _fetch_and_store(t: str) -> Quote:
+    return _store(await _race(t))
+
+def _track(t: str, fut: asyncio.Future) -> asyncio.Future:
+    _stats["refreshes"] += 1
+    _inflight[t] = fut
+    fut.add_done_callback(lambda _: _inflight.pop(t, None))
+    return fut
+
+def _refresh(t: str) -> asyncio.Future:
+    return _inflight.get(t) or _track(t, asyncio.ensure_future(_fetch_and_store(t)))
+
+def _peek(t: str) -> Optional[Quote]:
+    """Fresh or stale-but-usable cached quote (stale kicks off a background refresh)."""
+    entry = _cache.get(t)
+    if entry is None:
+        return None
+    quote, at = entry
+    age = time.monotonic() - at
+    if age < CACHE_TTL:
+        _stats["hits"] += 1
+        return quote
+    if age < CACHE_TTL + CACHE_STALE:
+        _stats["stale_hits"] += 1
+        _refresh(t)  # revalidate in the background, answer now
+        return quote
+    return None
+
+async def _cached(t: str) -> Quote:
+    quote = _peek(t)
+    if quote is not None:
+        return quote
+    _stats["misses"] += 1
+    # shield: a caller giving up must not cancel the fetch other callers are sharing
+    return await asyncio.shield(_refresh(t))
+
+async def _stats_snapshot() -> dict:
+    return dict(_stats, size=len(_cache))
+
+async def _clear():
+    _cache.clear()
+    for k in _stats:
+        _stats[k] = 0
+
+# ------------------------------ Batch ------------------------------
+
+async def _stooq_first(t: str) -> Optional[Quote]:
+    for quote in await asyncio.gather(*(_stooq(t, sym) for sym in (t.lower(), f"{t.lower()}.us"))):
+        if quote:
+            return quote
+    return None
+
+def _yahoo_batch_sync(tickers: list[str]) -> dict[str, float]:
+    """Last close per ticker from one multi-ticker yf.download call."""
+    import yfinance as yf
+
+    hist = yf.download(tickers, period="5d", interval="1d", progress=False, group_by="column")
+    if hist.empty:
+        return {}
+    close = hist["Close"]
+    out = {}
+    for t in tickers:
+        if hasattr(close, "columns"):
+            if t not in close.columns:
+                continue
+            col = close[t]
+        else:  # single ticker: a plain Series
+            col = close
+        col = col.dropna()
+        if not col.empty:
+            out[t] = float(col.iloc[-1])
+    return out
+
+async def _fetch_batch(todo: list[str], futs: dict[str, asyncio.Future]):
+    """Stooq per ticker (concurrently) raced against one Yahoo multi-ticker download."""
+    yahoo = asyncio.ensure_future(asyncio.to_thread(_yahoo_batch_sync, todo))
+    try:
+        stooq = await asyncio.gather(*(_stooq_first(t) for t in todo))
+        closes, yahoo_error = {}, None
+        if any(q is None for q in stooq):
+            try:
+                closes = await yahoo
+            except Exception as e:
+                yahoo_error = e
+        for t, quote in zip(todo, stooq):
+            if quote is None and t in closes:
+                quote = Quote(t, closes[t], "Yahoo", f"Recent close for {t} is ${closes[t]:.2f} (Yahoo).")
+            elif quote is None and yahoo_error is not None:
+                quote = Quote(t, None, "", f"Price lookup error for {t}: {yahoo_error}")
+            elif quote is None:
+                quote = Quote(t, None, "", f"No price data returned for {t}. Try later or another ticker.")
+            futs[t].set_result(_store(quote))
+    except BaseException as e:
+        for fut in futs.values():
+            if not fut.done():
+                fut.set_exception(e)
+        raise
+    finally:
+        yahoo.cancel()
+
+async def _batch(tickers: list[str]) -> list[Quote]:
+    found: dict[str, asyncio.Future] = {}
+    todo = []
+    loop = asyncio.get_running_loop()
+    for t in dict.fromkeys(tickers):
+        quote = _peek(t)
+        if quote is not None:
+            found[t] = loop.create_future()
+            found[t].set_result(quote)
+            continue
+        _stats["misses"] += 1
+        if t in _inflight:
+            found[t] = _inflight[t]
+        else:
+            found[t] = _track(t, loop.create_future())
+            todo.append(t)
+    if todo:
+        asyncio.ensure_future(_fetch_batch(todo, {t: found[t] for t in todo}))
+    quotes = dict(zip(found, await asyncio.gather(*(asyncio.shield(f) for f in found.values()))))
+    return [quotes[t] for t in tickers]
+
+# ------------------------------ Public API ------------------------------
+
+def _normalize(ticker: str) -> str:
+    return (ticker or "").strip().upper()
+
+async def aget_quote(ticker: str) -> Quote:
+    """Cached Quote for `ticker` (see module notes for TTL / stale-while-revalidate)."""
+    t = _normalize(ticker)
+    if not t:
+        return Quote("", None, "", "No ticker given.")
+    return await asyncio.wrap_future(submit(_cached(t)))
+
+def get_quote(ticker: str) -> Quote:
+    """Blocking wrapper around aget_quote for sync callers (e.g. AgentExecutor.invoke)."""
+    t = _normalize(ticker)
+    if not t:
+        return Quote("", None, "", "No ticker given.")
+    return submit(_cached(t)).result()
+
+async def aget_price(ticker: str) -> str:
+    """Latest price message for `ticker`, e.g. 'The latest price of NVDA is $1.23 (Stooq NVDA.US).'"""
+    return (await aget_quote(ticker)).message
+
+def get_price(ticker: str) -> str:
+    return get_quote(ticker).message
+
+def _normalize_many(tickers) -> list[str]:
+    if isinstance(tickers, str):
+        tickers = tickers.replace(",", " ").split()
+    return [t for t in (_normalize(x) for x in tickers) if t]
+
+async def aget_quotes(tickers) -> list[Quote]:
+    """
+    Quotes for many tickers at once (list, or a 'NVDA, AMD MSFT' string), in input order.
+    Cached tickers are answered from cache; the rest are fetched together: Stooq per
+    ticker concurrently, with a single yfinance multi-ticker download as the fallback.
+    """
+    ts = _normalize_many(tickers)
+    if not ts:
+        return []
+    return await asyncio.wrap_future(submit(_batch(ts)))
+
+def get_quotes(tickers) -> list[Quote]:
+    ts = _normalize_many(tickers)
+    if not ts:
+        return []
+    return submit(_batch(ts)).result()
+
+def format_table(quotes: list[Quote]) -> str:
+    """Compact fixed-width table: one 'TICKER  $PRICE  SOURCE' row per quote."""
+    if not quotes:
+        return "No tickers given."
+    width = max(6, *(len(q.ticker) for q in quotes))
+    rows = [f"{'TICKER':<{width}}  {'PRICE':>10}  SOURCE"]
+    for q in quotes:
+        price = f"${q.price:,.2f}" if q.price is not None else "n/a"
+        rows.append(f"{q.ticker:<{width}}  {price:>10}  {q.source or q.message}")
+    return "\n".join(rows)
+
+def cache_stats() -> dict:
+    """Counters since start (or clear_cache): hits, stale_hits, misses, refreshes, errors, size."""
+    return submit(_stats_snapshot()).result()
+
+def clear_cache():
+    submit(_clear()).result()
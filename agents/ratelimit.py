@@ -0,0 +1,160 @@
+# agents/ratelimit.py — process-wide rate limiting for Gemini calls
+#
+# Two token buckets shared by every agent in the process: requests/minute and
+# tokens/minute. A call reserves one request plus an estimated token count up front
+# (reservations queue, so callers are spaced out rather than released in a burst) and
+# the estimate is corrected from the response's usage metadata afterwards.
+#
+# On a 429 the caller backs off with full jitter, or for the server's retry-after hint
+# when there is one; a hint also pauses new admissions for everyone until it expires,
+# so the rest of the process stops adding to the overload instead of each worker
+# discovering it separately.
+#
+# Limits come from GEMINI_RPM / GEMINI_TPM (defaults: the gemini-2.0-flash free tier).
+# With AGENT_WORKERS=1 every worker process has its own buckets; size them accordingly.
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from agents.llm_cache import CACHED_FLAG
+
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "15"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "1000000"))
+EST_TOKENS = int(os.getenv("GEMINI_EST_TOKENS", "1500"))  # charged per call until usage is known
+BACKOFF_BASE = 1.0   # seconds; first retry waits up to this long
+BACKOFF_CAP = 60.0   # no single backoff waits longer than this
+
+
+class TokenBucket:
+    """
+    Reservation-style bucket refilled at per_minute/60 per second, holding at most
+    `burst`. reserve() always succeeds and returns how long the caller must wait for its
+    share, so concurrent callers are queued in arrival order. Thread-safe.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, per_minute / 6)  # ~10s worth
+        self.level = self.capacity
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def reserve(self, n: float = 1.0) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level -= n
+            return max(0.0, -self.level / self.rate)
+
+    def adjust(self, n: float):
+        """Charge (n > 0) or refund (n < 0) after the fact, e.g. once real usage is known."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level -= n
+
+
+_RETRY_HINT = re.compile(r"retry in ([\d.]+)\s*s|retry_delay\s*\{\s*seconds:\s*(\d+)", re.I)
+
+def retry_after_hint(exc: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from a retry_after attribute, a Retry-After
+    header, or the RetryInfo text Gemini puts in its 429 message; None if absent."""
+    hint = getattr(exc, "retry_after", None)
+    if hint is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        hint = headers.get("retry-after") if hasattr(headers, "get") else None
+    if hint is None:
+        m = _RETRY_HINT.search(str(exc))
+        hint = m and (m.group(1) or m.group(2))
+    try:
+        return float(hint) if hint is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, hint: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; with a server hint, the hint plus a little jitter."""
+    if hint is not None:
+        return hint + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class GeminiRateLimiter(BaseRateLimiter):
+    """RPM + TPM admission for chat models (pass as `rate_limiter=`), plus 429 backoff."""
+
+    def __init__(self, rpm: float = GEMINI_RPM, tpm: float = GEMINI_TPM, est_tokens: int = EST_TOKENS):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm, burst=tpm)
+        self.est_tokens = est_tokens
+        self._paused_until = 0.0  # monotonic; set from retry-after hints
+
+    def _reserve(self) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(self.est_tokens))
+        return max(wait, self._paused_until - time.monotonic())
+
+    def _refund(self):
+        self.requests.adjust(-1)
+        self.tokens.adjust(-self.est_tokens)
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        wait = self._reserve()
+        if wait > 0:
+            if not blocking:
+                self._refund()
+                return False
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        wait = self._reserve()
+        if wait > 0:
+            if not blocking:
+                self._refund()
+                return False
+            await asyncio.sleep(wait)
+        return True
+
+    def record_usage(self, total_tokens: int):
+        self.tokens.adjust(total_tokens - self.est_tokens)
+
+    def on_rate_limited(self, exc: BaseException, attempt: int, waited: float = 0.0) -> float:
+        """Delay before retry `attempt` after a 429; a server hint pauses everyone.
+        `waited` is time already slept since the 429 arrived (it counts towards the hint)."""
+        hint = retry_after_hint(exc)
+        if hint is not None:
+            self._paused_until = max(self._paused_until, time.monotonic() + hint - waited)
+        return max(0.0, backoff_delay(attempt, hint) - waited)
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Feeds each response's token usage back into the limiter's TPM bucket."""
+
+    def __init__(self, limiter: GeminiRateLimiter):
+        self.limiter = limiter
+
+    def on_llm_end(self, response, **kwargs):
+        used = 0
+        for gens in response.generations:
+            for g in gens:
+                if (g.generation_info or {}).get(CACHED_FLAG):
+                    continue  # replayed from agents/llm_cache.py: no API call, no tokens
+                usage = getattr(getattr(g, "message", None), "usage_metadata", None) or {}
+                used += usage.get("total_tokens", 0)
+        if used:
+            self.limiter.record_usage(used)
+
+
+@lru_cache(maxsize=None)
+def get_limiter() -> GeminiRateLimiter:
+    """The one limiter every Gemini client in this process shares."""
+    return GeminiRateLimiter()
@@ -0,0 +1,123 @@
+# agents/registry.py — one place that knows about every agent, for in-process callers
+#
+# demo.py and gradio_app.py both look agents up here instead of spawning the scripts.
+# Modules are imported on first use and each builds its LLM/executor lazily, so looking
+# an agent up (or listing them for a dropdown) costs nothing.
+
+import asyncio
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:  # importable from the agent scripts as well as from ROOT
+    sys.path.insert(0, str(ROOT))
+
+from agents.concurrency import ConcurrencyGate
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class RegisteredAgent:
+    """
+    A lazily imported agent module behind one shared call shape:
+      run(ticker, max, fresh, mode) -> final text   (arun for async callers)
+      run_brief(ticker, max, fresh, mode) -> typed Brief, for structured/direct modes
+      astream(ticker, max, fresh, mode) -> async (kind, text) progress events, see agents.streaming
+    Only agents with takes_stock_args=True use ticker/max/fresh/mode; the others ignore them.
+
+    `gate` caps concurrent runs for UI callers; limits come from <KEY>_CONCURRENCY and
+    <KEY>_QUEUE env vars (e.g. GEMINI_REACT_CONCURRENCY=2), else the defaults given here.
+    """
+
+    def __init__(self, key: str, label: str, module: str, takes_stock_args: bool = False,
+                 concurrency: int = 4, queue: int = 16):
+        self.key = key
+        self.label = label
+        self.module_name = module
+        self.takes_stock_args = takes_stock_args
+        self._module = None
+        env = key.upper()
+        self.gate = ConcurrencyGate(
+            label,
+            limit=_env_int(f"{env}_CONCURRENCY", concurrency),
+            max_queue=_env_int(f"{env}_QUEUE", queue),
+        )
+
+    @property
+    def module(self):
+        if self._module is None:
+            self._module = importlib.import_module(self.module_name)
+        return self._module
+
+    def _kwargs(self, ticker: Optional[str], max: Optional[int], fresh: Optional[int],
+                mode: Optional[str] = None) -> dict:
+        if not self.takes_stock_args:
+            return {}
+        given = {"ticker": ticker, "max": max, "fresh": fresh, "mode": mode}
+        return {k: v for k, v in given.items() if v not in (None, "")}
+
+    def run(self, ticker: Optional[str] = None, max: Optional[int] = None, fresh: Optional[int] = None,
+            mode: Optional[str] = None) -> str:
+        return self.module.run(**self._kwargs(ticker, max, fresh, mode))
+
+    async def arun(self, ticker: Optional[str] = None, max: Optional[int] = None, fresh: Optional[int] = None,
+                   mode: Optional[str] = None) -> str:
+        arun = getattr(self.module, "arun", None)
+        if arun is None:
+            return await asyncio.to_thread(self.run, ticker, max, fresh, mode)
+        return await arun(**self._kwargs(ticker, max, fresh, mode))
+
+    def run_brief(self, ticker: Optional[str] = None, max: Optional[int] = None, fresh: Optional[int] = None,
+                  mode: Optional[str] = None):
+        """The typed Brief (price, headlines with urls) for agents that build one."""
+        return self.module.run_brief(**self._kwargs(ticker, max, fresh, mode))
+
+    async def astream(self, ticker: Optional[str] = None, max: Optional[int] = None, fresh: Optional[int] = None,
+                      mode: Optional[str] = None):
+        astream = getattr(self.module, "astream", None)
+        if astream is None:
+            yield "final", await self.arun(ticker, max, fresh, mode)
+            return
+        async for event in astream(**self._kwargs(ticker, max, fresh, mode)):
+            yield event
+
+    def warm(self):
+        """Import the module and build its executor now instead of on the first request."""
+        self.module.get_agent_executor()
+
+    def __repr__(self):
+        return f"RegisteredAgent({self.key!r}, {self.module_name!r})"
+
+
+AGENTS = {
+    a.key: a
+    for a in (
+        RegisteredAgent("react_calculator", "Calculator", "agents.calculator_agent"),
+        RegisteredAgent("tool_exchange", "Currency Exchange", "agents.agent"),
+        # two tool calls + several LLM turns per run: keep it tight to respect Gemini quota
+        RegisteredAgent("gemini_react", "Stock & Headlines (Gemini)", "agents.langchain_gemini_agent",
+                        takes_stock_args=True, concurrency=2, queue=8),
+    )
+}
+
+def get(name: str) -> RegisteredAgent:
+    """Look an agent up by CLI key ('gemini_react') or UI label ('Stock & Headlines (Gemini)')."""
+    if name in AGENTS:
+        return AGENTS[name]
+    for a in AGENTS.values():
+        if a.label == name:
+            return a
+    raise KeyError(f"Unknown agent: {name}")
+
+def labels() -> list[str]:
+    return [a.label for a in AGENTS.values()]
+
+def queue_depths() -> list[dict]:
+    return [a.gate.depth() for a in AGENTS.values()]
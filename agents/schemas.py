@@ -0,0 +1,20 @@
+# agents/schemas.py — pydantic schemas for structured model output
+#
+# Imported lazily by the executor builders (pydantic is only needed once an LLM is in
+# play); the rest of the code works with the plain NamedTuples in agents.textnorm.
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class HeadlineItem(BaseModel):
+    title: str = Field(description="Headline title, without the trailing ' - Publisher' tag")
+    host: str = Field(description="Publisher name or site host")
+    url: str = Field("", description="Article link exactly as the headlines tool returned it")
+
+
+class StockBrief(BaseModel):
+    """Final answer for a ticker: latest price and recent headlines."""
+    price: Optional[float] = Field(None, description="Latest price as a plain number (no $), null if unavailable")
+    headlines: list[HeadlineItem] = Field(default_factory=list, description="3-5 recent headlines, newest first")
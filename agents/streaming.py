@@ -0,0 +1,101 @@
+# agents/streaming.py — turn AgentExecutor.astream_events into UI-sized progress events
+#
+# Every agent exposes astream(...) built on stream_progress(); it yields (kind, text):
+#   ("tool", "get_stock_price(NVDA)")     a tool call the agent just made
+#   ("observation", "The latest ...")     what that tool returned
+#   ("token", "...")                      a piece of the Final Answer, as the LLM writes it
+#   ("final", "...")                      the executor's complete output (always last)
+# The ReAct scratchpad (Thought/Action text) is never surfaced, only the Final Answer tokens.
+# Tool-calling agents have no scratchpad text (calls are structured), so they pass
+# final_marker=None and every text token counts as answer.
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+FINAL_MARKER = "Final Answer:"
+
+StreamEvent = tuple[str, str]
+
+_FINAL_SENT = object()  # key in the per-run buffers dict once "final" has been emitted
+
+
+def _translate(ev: dict, buffers: dict, marker: Optional[str] = FINAL_MARKER) -> list[StreamEvent]:
+    kind = ev["event"]
+    data = ev.get("data", {})
+
+    # the executor's own stream (root run): actions taken, their observations, the output
+    if kind == "on_chain_stream" and not ev.get("parent_ids"):
+        chunk = data.get("chunk") or {}
+        events = [("tool", f"{a.tool}({a.tool_input})") for a in chunk.get("actions", ())]
+        events += [("observation", str(s.observation).strip()) for s in chunk.get("steps", ())]
+        if "output" in chunk and not buffers.get(_FINAL_SENT):
+            buffers[_FINAL_SENT] = True
+            events.append(("final", str(chunk["output"])))
+        return events
+
+    # the output chunk can arrive after the root's end event, or (single-step runs) not
+    # at all; whichever comes first provides "final"
+    if kind == "on_chain_end" and not ev.get("parent_ids"):
+        output = data.get("output")
+        if isinstance(output, dict) and "output" in output and not buffers.get(_FINAL_SENT):
+            buffers[_FINAL_SENT] = True
+            return [("final", str(output["output"]))]
+        return []
+
+    # LLM tokens: only the part after "Final Answer:" is user-facing
+    if kind == "on_chat_model_stream":
+        piece = getattr(data.get("chunk"), "content", "") or ""
+        if not isinstance(piece, str) or not piece:
+            return []
+        if marker is None:
+            return [("token", piece)]
+        run_id = ev["run_id"]
+        text = buffers.get(run_id, "") + piece
+        buffers[run_id] = text
+        pos = text.find(marker)
+        if pos < 0:
+            return []
+        # emit only what this chunk added past the marker
+        new = text[max(len(text) - len(piece), pos + len(marker)):]
+        return [("token", new)] if new else []
+
+    return []
+
+
+def tool_name(event_text: str) -> str:
+    """The tool name from a ("tool", "name(input)") event's text."""
+    return event_text.split("(", 1)[0]
+
+
+async def _pump(executor, inputs: dict, queue: asyncio.Queue, marker: Optional[str]):
+    buffers: dict = {}
+    try:
+        async for ev in executor.astream_events(inputs, version="v2"):
+            for item in _translate(ev, buffers, marker):
+                await queue.put(item)
+    except Exception as e:
+        await queue.put(("error", e))
+    finally:
+        await queue.put(None)
+
+
+async def _drain(queue: asyncio.Queue, task: asyncio.Task) -> AsyncIterator[StreamEvent]:
+    try:
+        while (item := await queue.get()) is not None:
+            if item[0] == "error":
+                raise item[1]
+            yield item
+    finally:
+        task.cancel()  # consumer went away (or we finished): stop the executor
+
+
+def stream_progress(executor, inputs: dict, final_marker: Optional[str] = FINAL_MARKER) -> AsyncIterator[StreamEvent]:
+    """
+    Start the executor run now and return an async iterator over its progress events.
+    The run is a separate task that snapshots the caller's contextvars at this call,
+    so per-run settings set just before calling are seen by the tools.
+    Must be called with a running event loop.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(_pump(executor, inputs, queue, final_marker))
+    return _drain(queue, task)
@@ -0,0 +1,161 @@
+# agents/textnorm.py — shared text normalization for headlines and the stock agent's output
+#
+# Used by the news tools (clean_title, title_words), format_guard and to_json, and renders
+# the typed Brief that structured mode and the direct pipeline produce. Patterns are
+# compiled once; a title is cleaned in one regex pass instead of a chain of re.sub calls,
+# and bullets only pay for the punctuation scan when they actually contain non-ASCII text.
+# benchmarks/text_normalize.py times these against the previous implementation: only
+# clean_title is measurably faster; format_guard and to_json are on par with the old code.
+
+import json
+import re
+from typing import NamedTuple, Optional
+
+PRICE_RE = re.compile(r"^\$\d[\d,]*\.?\d*$")
+
+# parentheticals like (NASDAQ:NVDA), or runs of 2+ whitespace; one scan handles both
+_TITLE_JUNK = re.compile(r"(?P<paren>\s*\([^)]+\))|\s{2,}")
+
+# curly quotes -> straight; unicode hyphen/minus variants -> '-' (spaced '-' becomes ' – ' below)
+_PUNCT_MAP = {
+    "’": "'", "‘": "'", "“": '"', "”": '"',
+    "‐": "-", "‑": "-", "‒": "-", "−": "-",
+}
+# a regex sub beats str.translate here: translate with a dict table walks every char in Python
+_PUNCT_RE = re.compile("[" + "".join(_PUNCT_MAP) + "]")
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+EN_DASH_SEP = " – "
+NO_HEADLINES = "No recent headlines found."
+
+
+def _title_sub(m: re.Match) -> str:
+    return "" if m.lastgroup == "paren" else " "
+
+def _punct_sub(m: re.Match) -> str:
+    return _PUNCT_MAP[m.group()]
+
+def clean_title(s: str) -> str:
+    """Drop parentheticals like (NASDAQ:NVDA) and collapse extra spaces."""
+    # substring checks are far cheaper than a regex scan; isprintable() rules out tabs/NBSPs
+    if "(" not in s and "  " not in s and s.isprintable():
+        return s.strip()
+    return _TITLE_JUNK.sub(_title_sub, s).strip()
+
+def normalize_bullet(s: str) -> str:
+    """Straight quotes, and ' - ' separators as en dashes: 'Title – host'."""
+    s = s.strip()
+    if not s.isascii():  # most feed titles are plain ASCII; skip the scan for those
+        s = _PUNCT_RE.sub(_punct_sub, s)
+    return s.replace(" - ", EN_DASH_SEP)
+
+def split_publisher(title: str) -> tuple[str, str]:
+    """'Title - Reuters' -> ('Title', 'Reuters'); publisher is '' when there is no tag."""
+    base, sep, tail = title.rpartition(" - ")
+    if sep and len(tail.split()) <= 4:  # Google News appends the outlet name this way
+        return base.strip(), tail.strip()
+    return title, ""
+
+def title_words(title: str) -> frozenset:
+    """Normalized word set for near-duplicate checks: lowercased, punctuation-free, no ' - Publisher' tag."""
+    return frozenset(_NON_WORD.sub(" ", split_publisher(title)[0].lower()).split())
+
+def split_bullet(txt: str) -> tuple[str, str]:
+    """'Title – host' -> (title, host); host is '' when there is no separator."""
+    title, _, host = txt.partition(EN_DASH_SEP)
+    return title.strip(), host.strip()
+
+
+def format_guard(out_str: str, max_bullets: int) -> str:
+    """Normalize final output: one price line + up to N bullets, no URLs."""
+    first = price = None
+    bullets = []
+    # one pass: first line, first valid price line, "- " bullets (normalized, clamped)
+    for raw in (out_str or "").splitlines():
+        l = raw.strip()
+        if not l:
+            continue
+        if first is None:
+            first = l
+        if l.startswith("- "):
+            if len(bullets) < max_bullets:
+                bullets.append(normalize_bullet(l[2:]))
+        elif price is None and PRICE_RE.match(l):
+            price = l
+    if first is None:
+        return out_str
+
+    if not bullets:
+        bullets = [NO_HEADLINES][:max_bullets]
+    return "\n".join([price or first] + [f"- {b}" for b in bullets])
+
+def to_json(out_str: str) -> str:
+    """Convert the clean output to JSON: {'price': '$x', 'headlines': [{title,host}]}"""
+    price = None
+    headlines = []
+    for raw in (out_str or "").splitlines():
+        l = raw.strip()
+        if not l:
+            continue
+        if price is None:
+            price = l
+        elif l.startswith("- "):
+            title, host = split_bullet(l[2:].strip())
+            headlines.append({"title": title, "host": host})
+    return json.dumps({"price": price or "", "headlines": headlines}, ensure_ascii=False, indent=2)
+
+
+# ------------------------------ typed answer ------------------------------
+# Built from structured model output (or directly from tool results), then rendered;
+# the text is derived from the object, so nothing is re-parsed.
+
+class Headline(NamedTuple):
+    title: str
+    host: str
+    url: str = ""
+
+class Brief(NamedTuple):
+    price: Optional[float]
+    headlines: tuple = ()
+    note: str = ""  # shown instead of the price when there is none (e.g. the lookup error)
+
+    def __str__(self) -> str:
+        return render_brief(self)
+
+def _price_line(brief: Brief) -> str:
+    if brief.price is not None:
+        return f"${brief.price:,.2f}"
+    return brief.note or "Price unavailable."
+
+def render_brief(brief: Brief, max_bullets: Optional[int] = None) -> str:
+    """Same text format_guard produces: one price line + "- Title – host" bullets."""
+    bullets = [
+        f"- {normalize_bullet(h.title)}{EN_DASH_SEP}{h.host}" if h.host else f"- {normalize_bullet(h.title)}"
+        for h in brief.headlines[:max_bullets]
+    ]
+    return "\n".join([_price_line(brief)] + (bullets or [f"- {NO_HEADLINES}"]))
+
+def brief_to_json(brief: Brief, max_bullets: Optional[int] = None) -> str:
+    """to_json's shape, plus each headline's url."""
+    headlines = [
+        {"title": normalize_bullet(h.title), "host": h.host, "url": h.url}
+        for h in brief.headlines[:max_bullets]
+    ]
+    return json.dumps({"price": _price_line(brief), "headlines": headlines}, ensure_ascii=False, indent=2)
+
+def brief_from_text(out_str: str) -> Brief:
+    """Best-effort Brief from format_guard-style text (for when a model answered in prose)."""
+    price, note, headlines = None, "", []
+    for raw in (out_str or "").splitlines():
+        l = raw.strip()
+        if l.startswith("- "):
+            title, host = split_bullet(l[2:].strip())
+            if title != NO_HEADLINES:
+                headlines.append(Headline(title, host))
+        elif l and price is None and not note:
+            if PRICE_RE.match(l):
+                price = float(l[1:].replace(",", ""))
+            else:
+                note = l
+    return Brief(price, tuple(headlines), note)
@@ -0,0 +1,129 @@
+# agents/worker_pool.py — warm, long-lived worker processes for the agents
+#
+# Opt-in process isolation for the Gradio app: each worker process imports one agent
+# module once, builds its executor once and then serves registry.run(...) calls over a
+# multiprocessing Pipe. A request is the keyword args for RegisteredAgent.run; the reply
+# is (ok, text). A worker handles one request at a time, so an agent gets as many workers
+# as its gate admits runs (sizes given to AgentWorkerPool); extra ones start on demand.
+#
+# Workers are spawned, so they re-import the parent's __main__ module: launchers must keep
+# UI/pool construction under `if __name__ == "__main__"` (see gradio_app.main).
+
+import atexit
+import multiprocessing as mp
+import queue
+import threading
+import traceback
+
+# "spawn" keeps workers clean of the parent's threads (Gradio runs its own)
+_CTX = mp.get_context("spawn")
+
+DEFAULT_TIMEOUT = 180  # seconds per request before the worker is recycled
+
+# ------------------------------ Worker side ------------------------------
+
+def _serve(conn, key: str):
+    """Worker loop: build the agent once, then answer run() requests until told to stop (None)."""
+    try:
+        from agents import registry
+        agent, load_error = registry.get(key), None
+        agent.warm()
+    except Exception:
+        agent, load_error = None, traceback.format_exc()
+
+    while True:
+        try:
+            kwargs = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if kwargs is None:
+            break
+        if agent is None:
+            conn.send((False, load_error))
+            continue
+        try:
+            conn.send((True, agent.run(**kwargs)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+# ------------------------------ Parent side ------------------------------
+
+class AgentWorker:
+    """One warm process for one registry agent. Requests are serialized per worker."""
+
+    def __init__(self, key: str, timeout: float = DEFAULT_TIMEOUT):
+        self.key = key
+        self.timeout = timeout
+        self._proc = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def start(self):
+        if self._alive():
+            return
+        parent, child = _CTX.Pipe()
+        proc = _CTX.Process(target=_serve, args=(child, self.key), daemon=True,
+                            name=f"agent-worker:{self.key}")
+        proc.start()
+        child.close()
+        self._proc, self._conn = proc, parent
+
+    def stop(self):
+        if self._proc is None:
+            return
+        try:
+            self._conn.send(None)
+            self._proc.join(timeout=5)
+        except Exception:
+            pass
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self._conn.close()
+        self._proc, self._conn = None, None
+
+    def run(self, **kwargs) -> tuple[bool, str]:
+        with self._lock:
+            self.start()
+            try:
+                self._conn.send(kwargs)
+                if not self._conn.poll(self.timeout):
+                    self.stop()
+                    return False, f"Agent timed out after {self.timeout:.0f}s."
+                return self._conn.recv()
+            except (EOFError, OSError) as e:
+                # worker died mid-request; recycle it so the next click gets a fresh one
+                self.stop()
+                return False, f"Agent worker crashed: {e}"
+
+class AgentWorkerPool:
+    """Maps registry key -> `sizes[key]` AgentWorkers. Workers start lazily; warm() starts one each."""
+
+    def __init__(self, sizes: dict[str, int], timeout: float = DEFAULT_TIMEOUT):
+        self.workers = {key: [AgentWorker(key, timeout) for _ in range(max(1, n))] for key, n in sizes.items()}
+        # idle workers, most recently used on top, so extra processes only start under load
+        self._idle = {key: queue.LifoQueue() for key in self.workers}
+        for key, workers in self.workers.items():
+            for w in reversed(workers):
+                self._idle[key].put(w)
+        atexit.register(self.shutdown)
+
+    def warm(self):
+        for workers in self.workers.values():
+            workers[0].start()
+
+    def run(self, key: str, **kwargs) -> tuple[bool, str]:
+        idle = self._idle[key]
+        worker = idle.get()  # blocks only when more callers than workers
+        try:
+            return worker.run(**kwargs)
+        finally:
+            idle.put(worker)
+
+    def shutdown(self):
+        for workers in self.workers.values():
+            for w in workers:
+                w.stop()
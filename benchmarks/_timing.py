@@ -0,0 +1,8 @@
+# benchmarks/_timing.py — timing helper shared by the microbenchmarks
+
+import timeit
+
+def best_us(fn, number: int, repeat: int, items: int) -> float:
+    """Best-of-`repeat` time per item in µs, for `fn` processing `items` items per call."""
+    runs = timeit.repeat(fn, number=number, repeat=repeat)
+    return min(runs) / number / items * 1e6
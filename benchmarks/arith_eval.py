@@ -0,0 +1,61 @@
+# benchmarks/arith_eval.py — microbenchmark for agents.arith against eval()
+#
+# Times the calculator tool's evaluator on the kind of expressions a ReAct loop sends it:
+# the old eval() path, agents.arith on a cold cache (parse + validate + compile every
+# call) and on a warm one (the compiled expression is reused).
+#
+#   python benchmarks/arith_eval.py
+#   python benchmarks/arith_eval.py --number 5000 --repeat 7
+
+import argparse, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents import arith
+from benchmarks._timing import best_us
+
+# Plain Python arithmetic, so eval() and agents.arith must agree on every one.
+CORPUS = [
+    "18.75 * 3 * 1.15",
+    "18.75 * 3 + 18.75 * 3 * 0.15",
+    "(18.75 * 3) * (1 + 0.15)",
+    "2 + 2",
+    "3**4",
+    "1000 * (1 + 0.05)**10",
+    "(120 - 45) / 3",
+    "-2**2 + 7 / 2",
+    "((1.5 + 2.25) * 4 - 3) / (2**3)",
+    "250000 * 0.04 / 12",
+]
+
+def _check():
+    for e in CORPUS:
+        assert arith.evaluate(e) == eval(e), e
+
+def _cold():
+    arith.compile_expr.cache_clear()
+    return [arith.evaluate(e) for e in CORPUS]
+
+CASES = {
+    "eval": lambda: [eval(e) for e in CORPUS],
+    "arith (cold)": _cold,
+    "arith (warm)": lambda: [arith.evaluate(e) for e in CORPUS],
+}
+
+def main():
+    p = argparse.ArgumentParser(description="Microbenchmark for agents.arith vs eval")
+    p.add_argument("--number", type=int, default=1000, help="Calls per timing run")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    _check()
+    base = best_us(CASES["eval"], args.number, args.repeat, len(CORPUS))
+    print(f"{'case':<14}{'µs/expr':>10}{'vs eval':>10}")
+    for name, fn in CASES.items():
+        us = base if name == "eval" else best_us(fn, args.number, args.repeat, len(CORPUS))
+        print(f"{name:<14}{us:>10.2f}{base / us:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/import_time.py — track cold-start cost of the agent modules
+#
+# Each sample is a fresh interpreter (`python -X importtime -c "import <module>"`), so
+# nothing is shared between runs. Prints median/min wall time per module plus the
+# heaviest imports it pulled in, and exits non-zero if a --budget-ms is exceeded.
+#
+#   python benchmarks/import_time.py
+#   python benchmarks/import_time.py --runs 9 --budget-ms 400 agents.langchain_gemini_agent
+
+import argparse, os, statistics, subprocess, sys, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_TARGETS = [
+    "agents.langchain_gemini_agent",   # helpers + news tool, no LLM client
+    "agents.registry",
+    "agents.quotes",
+]
+
+def _sample(target: str) -> tuple[float, list[tuple[int, str]]]:
+    env = dict(os.environ, GOOGLE_API_KEY=os.getenv("GOOGLE_API_KEY", "bench"))
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+
+    # "import time: self [us] | cumulative | imported package"; nesting is shown by
+    # indentation and children are listed before their parent, so collect depth-1 rows
+    # until the target's own (depth-0) row closes them.
+    children, pending = [], []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            pending.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name.strip() == target.split(".")[0] or name.strip() == target:
+                children += pending
+            pending = []
+    return wall, sorted(children, reverse=True)
+
+def main():
+    p = argparse.ArgumentParser(description="Import-time benchmark for the agent modules")
+    p.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=5, help="Heaviest direct imports of each target to list")
+    p.add_argument("--budget-ms", type=float, default=None, help="Fail if any median exceeds this")
+    args = p.parse_args()
+
+    over = []
+    for target in args.targets:
+        walls, heaviest = [], []
+        for _ in range(args.runs):
+            wall, heaviest = _sample(target)
+            walls.append(wall * 1000)
+        med = statistics.median(walls)
+        print(f"{target:<36} median {med:7.1f} ms   min {min(walls):7.1f} ms   ({args.runs} runs)")
+        for us, name in heaviest[: args.top]:
+            print(f"    {us / 1000:7.1f} ms  {name}")
+        if args.budget_ms is not None and med > args.budget_ms:
+            over.append(target)
+
+    if over:
+        print(f"Over budget ({args.budget_ms:.0f} ms): {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/text_normalize.py — microbenchmark for agents.textnorm
+#
+# Times clean_title / format_guard / to_json on a corpus of Google News style headlines
+# against the implementations they replaced (kept below as `legacy_*`), so a regression
+# in the shared normalizer shows up as a ratio, not a feeling.
+#
+# Measured (CPython 3.11, --number 5000 --repeat 9, several runs on a noisy host):
+#   clean_title   1.3-1.5x faster, consistently
+#   format_guard  no reliable change: 0.6-1.06x run to run, i.e. within noise
+#   to_json       no change; json.dumps(indent=2) dominates it
+# Only clean_title has a measured gain; format_guard's single pass is kept for the
+# max_bullets early stop and the wider quote normalization, not for speed.
+#
+#   python benchmarks/text_normalize.py
+#   python benchmarks/text_normalize.py --number 2000 --repeat 7
+
+import argparse, json, re, sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agents import textnorm
+from benchmarks._timing import best_us
+
+# Headlines as Google News RSS returns them: outlet suffixes, exchange tags, curly quotes.
+CORPUS = [
+    "Nvidia (NASDAQ:NVDA) Stock Falls After Earnings Beat as Guidance Disappoints - Reuters",
+    "Nvidia’s Jensen Huang says demand for Blackwell is ‘insane’ - CNBC",
+    "Why Nvidia Stock (NVDA) Is Down Today - The Motley Fool",
+    "NVIDIA Corporation (NVDA)  Shares Sold by  Vanguard Group Inc. - MarketBeat",
+    "AMD unveils MI350 accelerators to rival Nvidia’s H200 - The Verge",
+    "Stock market today: Dow, S&P 500, Nasdaq slip as Nvidia weighs on tech - Yahoo Finance",
+    "Is Nvidia (NVDA) a Buy Ahead of Earnings?  Analysts Weigh In - Zacks Investment Research",
+    "Microsoft (MSFT) and OpenAI renegotiate partnership terms - Bloomberg",
+    "Apple (AAPL) shares rise after iPhone 17 pre-orders top estimates - Barron's",
+    "Tesla (NASDAQ:TSLA) recalls 200,000 vehicles over rear-view camera issue - AP News",
+    "“We’re just getting started”: Nvidia CEO on sovereign AI - Financial Times",
+    "Semiconductor ETF (SOXX) hits record as chip rally broadens - Investopedia",
+    "Shopify (TSX:SHOP) beats on revenue, shares jump 8% - The Globe and Mail",
+    "Nvidia market cap tops $4 trillion for first time - The Wall Street Journal",
+    "Broadcom (AVGO)  vs. Nvidia (NVDA): Which AI chip stock is the better buy? - Nasdaq",
+    "TSMC (TSM) monthly sales surge 40% on AI demand - Nikkei Asia",
+]
+
+def _final_block(rows: list[str], price: str = "$181.35") -> str:
+    # what the agent's Final Answer looks like before format_guard
+    return "Final Answer:\n" + price + "\n" + "\n".join(f"- {r.rsplit(' - ', 1)[0]} - example.com" for r in rows)
+
+BLOCKS = [_final_block(CORPUS[i:i + 5]) for i in range(0, len(CORPUS), 4)]
+
+# ------------------------------ previous implementations ------------------------------
+
+LEGACY_PRICE_RE = re.compile(r"^\$\d[\d,]*\.?\d*$")
+
+def legacy_clean_title(s: str) -> str:
+    s = re.sub(r"\s*\([^)]+\)", "", s)
+    s = re.sub(r"\s{2,}", " ", s).strip()
+    return s
+
+def legacy_format_guard(out_str: str, max_bullets: int) -> str:
+    lines = [l.strip() for l in (out_str or "").strip().splitlines() if l.strip()]
+    if not lines:
+        return out_str
+    price = next((l for l in lines if LEGACY_PRICE_RE.match(l)), lines[0])
+    bullets = []
+    for l in lines:
+        if l.startswith("- "):
+            b = l[2:].strip()
+            b = b.replace(" - ", " – ")
+            b = b.replace("’", "'")
+            bullets.append(b)
+    if not bullets:
+        bullets = ["No recent headlines found."]
+    bullets = bullets[:max_bullets]
+    return "\n".join([price] + [f"- {b}" for b in bullets])
+
+def legacy_to_json(out_str: str) -> str:
+    lines = [l.strip() for l in (out_str or "").strip().splitlines() if l.strip()]
+    price = lines[0] if lines else ""
+    headlines = []
+    for l in lines[1:]:
+        if l.startswith("- "):
+            txt = l[2:].strip()
+            if " – " in txt:
+                title, host = txt.split(" – ", 1)
+            else:
+                title, host = txt, ""
+            headlines.append({"title": title.strip(), "host": host.strip()})
+    return json.dumps({"price": price, "headlines": headlines}, ensure_ascii=False, indent=2)
+
+# ------------------------------ runner ------------------------------
+
+CASES = {
+    "clean_title": (
+        lambda: [legacy_clean_title(t) for t in CORPUS],
+        lambda: [textnorm.clean_title(t) for t in CORPUS],
+    ),
+    "format_guard": (
+        lambda: [legacy_format_guard(b, 4) for b in BLOCKS],
+        lambda: [textnorm.format_guard(b, 4) for b in BLOCKS],
+    ),
+    "to_json": (
+        lambda: [legacy_to_json(legacy_format_guard(b, 4)) for b in BLOCKS],
+        lambda: [textnorm.to_json(textnorm.format_guard(b, 4)) for b in BLOCKS],
+    ),
+}
+
+def main():
+    p = argparse.ArgumentParser(description="Microbenchmark for agents.textnorm")
+    p.add_argument("--number", type=int, default=1000, help="Calls per timing run")
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    print(f"{'case':<14}{'legacy µs/item':>16}{'textnorm µs/item':>18}{'speedup':>10}")
+    for name, (legacy, current) in CASES.items():
+        items = len(CORPUS) if name == "clean_title" else len(BLOCKS)
+        old = best_us(legacy, args.number, args.repeat, items)
+        new = best_us(current, args.number, args.repeat, items)
+        print(f"{name:<14}{old:>16.2f}{new:>18.2f}{old / new:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
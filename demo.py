@@ -1,116 +1,78 @@
-# demo.py — multi-agent launcher with post-formatting for gemini_react
+# demo.py — multi-agent launcher; runs the selected agent in-process via agents.registry
 
 from dotenv import load_dotenv; load_dotenv()
 
-import argparse, subprocess, sys, pathlib, re, json
+import argparse, json, sys
 
-ROOT = pathlib.Path(__file__).parent
-AGENTS = {
-    "react_calculator": ROOT / "agents" / "calculator_agent.py",
-    "gemini_react":     ROOT / "agents" / "langchain_gemini_agent.py",
-    "tool_exchange":    ROOT / "agents" / "agent.py",
-}
+from agents import registry
+from agents.langchain_gemini_agent import BRIEF_MODES, MODES
+from agents.textnorm import brief_to_json, render_brief, to_json
 
-# ---------- Output formatting helpers (for gemini_react only) ----------
-
-PRICE_RE = re.compile(r"^\$\d[\d,]*\.?\d*$")
-
-def format_guard(out_str: str, max_bullets: int) -> str:
-    """
-    Enforce:
-      - first line is a $price
-      - next N bullets in `- Title – host` style (no URLs)
-    Applies only to the text that appears after the line '----Final Result----'.
-    """
-    if not out_str.strip():
-        return out_str
-
-    # Find the "Final Result" section if present
-    marker = "----Final Result----"
-    if marker in out_str:
-        head, tail = out_str.split(marker, 1)
-        processed_tail = _format_final_block(tail, max_bullets)
-        return head + marker + processed_tail
-    else:
-        # If no marker, best-effort format the whole output
-        return _format_final_block(out_str, max_bullets)
-
-def _format_final_block(block: str, max_bullets: int) -> str:
-    lines = [l.strip() for l in block.strip().splitlines() if l.strip()]
-    if not lines:
-        return "\n\n(No output)\n"
-
-    # 1) keep first valid price line (or first line)
-    price = next((l for l in lines if PRICE_RE.match(l)), lines[0])
-
-    # 2) collect bullets
-    bullets = []
-    for l in lines:
-        if l.startswith("- "):
-            b = l[2:].strip()
-            b = b.replace(" - ", " – ")  # prefer en dash
-            b = b.replace("’", "'")      # normalize curly apostrophe
-            bullets.append(b)
-
-    if not bullets:
-        bullets = ["No recent headlines found."]
-    bullets = bullets[:max_bullets]
-
-    final = [price] + [f"- {b}" for b in bullets]
-    return "\n" + "\n".join(final) + "\n"
+AGENTS = registry.AGENTS
 
 # ---------- Runner ----------
 
-def run_agent(agent_path: pathlib.Path, args_to_pass: list[str], postprocess=False, max_bullets: int = 4):
+def run_agent(name: str, ticker=None, max=None, fresh=None, as_json: bool = False, mode=None) -> int:
     """
-    Runs the agent as a subprocess. If postprocess=True, applies format_guard to stdout.
+    Runs the agent in-process and prints its final output.
+    gemini_react output is already normalized by format_guard; it keeps the
+    '----Final Result----' header the CLI has always printed.
     """
-    cmd = [sys.executable, str(agent_path), *args_to_pass]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    out, err = proc.stdout, proc.stderr
-
-    if postprocess:
-        out = format_guard(out, max_bullets)
+    agent = registry.get(name)
+    brief = None
+    try:
+        if agent.takes_stock_args and as_json and mode in BRIEF_MODES:
+            # JSON straight from the typed answer, keeping the headline urls
+            brief = agent.run_brief(ticker=ticker, max=max, fresh=fresh, mode=mode)
+            out = render_brief(brief)
+        else:
+            out = agent.run(ticker=ticker, max=max, fresh=fresh, mode=mode)
+    except Exception as e:
+        print(f"Error running {name}: {e}", file=sys.stderr)
+        return 1
+
+    if agent.takes_stock_args:
+        print("----Final Result----")
+        print(out)
+        if as_json:
+            print(brief_to_json(brief) if brief is not None else to_json(out))
+    else:
+        print(out)
+    return 0
 
-    # Echo child output/stderr exactly (helpful when debugging)
-    if out:
-        print(out, end="")
-    if err:
-        print(err, file=sys.stderr, end="")
+def run_watchlist(tickers: list[str], as_json: bool = False) -> int:
+    """Several --ticker values: one batch price lookup, printed as a table (no LLM round trips)."""
+    from agents import quotes
 
-    return proc.returncode
+    rows = quotes.get_quotes(tickers)
+    if as_json:
+        print(json.dumps([q._asdict() for q in rows], ensure_ascii=False, indent=2))
+    else:
+        print(quotes.format_table(rows))
+    return 0 if any(q.price is not None for q in rows) else 1
 
 def main():
     p = argparse.ArgumentParser(description="Multi-agent demo launcher")
     p.add_argument("--which", choices=AGENTS.keys(), required=True, help="Which demo to run")
 
-    # Optional: pass-through tuning flags for gemini_react
-    p.add_argument("--ticker", default=None, help="Ticker for gemini_react (e.g., NVDA)")
+    # Optional: tuning flags for gemini_react (ignored by the other agents)
+    p.add_argument("--ticker", action="append", default=None,
+                   help="Ticker for gemini_react (e.g., NVDA); repeat (or use NVDA,AMD) for a batch price table")
     p.add_argument("--max", type=int, default=None, help="Headline count for gemini_react (1..5)")
     p.add_argument("--fresh", type=int, default=None, help="Recency window in days (1..7) for gemini_react")
     p.add_argument("--json", action="store_true", help="Ask gemini_react to also print JSON")
+    p.add_argument("--mode", choices=MODES, default=None,
+                   help="gemini_react: 'tools' = tool-calling agent (parallel tool calls), "
+                        "'structured' = tool-calling agent returning a typed answer, "
+                        "'direct' = price + headlines fetched concurrently without the LLM")
     args = p.parse_args()
 
-    agent_path = AGENTS[args.which]
-    child_args: list[str] = []
-
-    # Only gemini_react understands these flags; pass them through if provided.
-    if args.which == "gemini_react":
-        if args.ticker:
-            child_args += ["--ticker", args.ticker]
-        if args.max is not None:
-            child_args += ["--max", str(args.max)]
-        if args.fresh is not None:
-            child_args += ["--fresh", str(args.fresh)]
-        if args.json:
-            child_args += ["--json"]
-        # Postprocess final output to keep format tidy
-        max_bullets = args.max if (isinstance(args.max, int) and 1 <= args.max <= 5) else 4
-        rc = run_agent(agent_path, child_args, postprocess=True, max_bullets=max_bullets)
-        sys.exit(rc)
+    tickers = [t for arg in (args.ticker or []) for t in arg.replace(",", " ").split()]
+    if args.which == "gemini_react" and len(tickers) > 1:
+        sys.exit(run_watchlist(tickers, as_json=args.json))
 
-    # Other agents: just run as-is, no postprocessing
-    rc = run_agent(agent_path, child_args, postprocess=False)
+    ticker = tickers[0] if tickers else None
+    rc = run_agent(args.which, ticker=ticker, max=args.max, fresh=args.fresh, as_json=args.json, mode=args.mode)
     sys.exit(rc)
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+import pytest
+
+from agents.answer_cache import STOPPED_OUTPUT, AnswerCache, cacheable
+
+PIZZA = "If a pizza costs $18.75 and I want to buy 3, plus a 15% tip, what is the total cost"
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache("test", ttl=60)
+
+
+@pytest.mark.parametrize("q", ["What is 2 + 3?", "What is 2 * 3?", "2 - 3", "2 / 3", "2 ** 3", "2*3", "-2 + 3"])
+def test_bare_arithmetic_is_never_cached(cache, q):
+    cache.put("What is 2 + 3?", "5")
+    assert cache.get(q) is None
+
+
+@pytest.mark.parametrize("q", [
+    "What is the sum when I add 2 times 3 apples?",
+    "What is the sum when I add 2 minus 3 apples?",
+    "What is the sum when I add -2 plus 3 apples?",
+    "What is the sum when I add 2 ^ 3 apples?",
+])
+def test_different_operator_or_sign_misses(cache, q):
+    cache.put("What is the sum when I add 2 plus 3 apples?", "5 apples")
+    assert cache.get(q) is None
+
+
+def test_rephrasing_hits(cache):
+    cache.put("What is the sum when I add 2 plus 3 apples?", "5 apples")
+    assert cache.get("What's the sum when I add 2 plus 3 apples?") == "5 apples"
+    cache.put(PIZZA + "?", "$64.69")
+    assert cache.get("If a pizza costs $18.75 and I buy 3, plus a 15% tip, what's the total cost?") == "$64.69"
+
+
+@pytest.mark.parametrize("q", [
+    "If a pizza costs $18.75 and I want to buy 3, times a 15% tip, what is the total cost?",
+    "If a pizza costs $18.75 and I want to buy 4, plus a 15% tip, what is the total cost?",
+    PIZZA + " in euros?",
+    PIZZA + " rounded?",
+    PIZZA + " rounded to the nearest dollar?",
+    "If a pizza costs $18.75 and I want to buy 3, plus a 15% tip, what is the cost?",
+    "If a pizza costs $18.75 and I want to buy 3, plus a 15% tip, what is the overall cost?",
+])
+def test_changed_numbers_operators_or_qualifiers_miss(cache, q):
+    cache.put(PIZZA + "?", "$64.69")
+    assert cache.get(q) is None
+
+
+@pytest.mark.parametrize("q", [
+    "What is the exchange rate between EUR and USD?",
+    "What is the real-time exchange rate between USD and EUR?",  # time-sensitive
+    "What is the exchange rate between USD and EUR in cash?",
+])
+def test_currency_pair_order_and_qualifiers(cache, q):
+    cache.put("What is the exchange rate between USD and EUR?", "1 USD = 0.93 EUR")
+    assert cache.get(q) is None
+
+
+def test_conversion_amount_and_rounding_miss(cache):
+    cache.put("Convert USD to EUR", "1 USD = 0.93 EUR")
+    assert cache.get("Convert 100 USD into EUR") is None
+    assert cache.get("Convert USD to EUR rounded") is None
+    assert cache.get("Please convert USD into EUR") == "1 USD = 0.93 EUR"
+
+
+def test_ttl_zero_disables():
+    c = AnswerCache("off", ttl=0)
+    c.put(PIZZA, "$64.69")
+    assert c.get(PIZZA) is None
+
+
+def test_lru_bound():
+    c = AnswerCache("small", ttl=60, max_entries=2)
+    for n in range(3):
+        c.put(f"How many apples are {n} apples?", str(n))
+    assert c.get("How many apples are 0 apples?") is None
+    assert c.get("How many apples are 2 apples?") == "2"
+    assert c.stats()["entries"] == 2
+
+
+def test_cacheable():
+    assert cacheable("64.6875", ["calculator"])
+    assert not cacheable(STOPPED_OUTPUT, ["calculator"] * 15)
+    assert not cacheable("", [])
+    assert not cacheable("best effort", ["get_exchange_rate"] * 4, max_iterations=4)  # generated at the limit
+    assert cacheable("0.93", ["get_exchange_rate"], max_iterations=4)
+    assert not cacheable("0.93", ["_Exception", "get_exchange_rate"])
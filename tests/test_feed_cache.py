@@ -0,0 +1,37 @@
+import os
+import time
+
+from agents.feed_cache import FeedCache
+
+
+def test_early_stop_keeps_fuller_rows_for_same_validators(tmp_path):
+    c = FeedCache(tmp_path)
+    c.save("u", {"etag": "e", "complete": True, "rows": [["a"], ["b"], ["c"]], "fetched_at": 1})
+    c.save("u", {"etag": "e", "complete": False, "rows": [["a"]], "fetched_at": 5})
+    entry = c.load("u")
+    assert entry["rows"] == [["a"], ["b"], ["c"]] and entry["fetched_at"] == 5
+
+
+def test_changed_validators_replace_rows(tmp_path):
+    c = FeedCache(tmp_path)
+    c.save("u", {"etag": "e", "complete": True, "rows": [["a"], ["b"]], "fetched_at": 1})
+    c.save("u", {"etag": "f", "complete": False, "rows": [["new"]], "fetched_at": 5})
+    assert c.load("u")["rows"] == [["new"]]
+
+
+def test_no_validators_newer_fetch_wins(tmp_path):
+    c = FeedCache(tmp_path)
+    c.save("u", {"etag": None, "last_modified": None, "complete": True, "rows": [["old"], ["b"]], "fetched_at": 1})
+    c.save("u", {"etag": None, "last_modified": None, "complete": False, "rows": [["new"]], "fetched_at": 5})
+    assert c.load("u")["rows"] == [["new"]]
+
+
+def test_prune_by_count_and_age(tmp_path):
+    c = FeedCache(tmp_path, max_entries=3, max_age=100)
+    for i in range(5):
+        c.save(f"x{i}", {"rows": []})
+        os.utime(c._path(f"x{i}"), (time.time() - 10 + i, time.time() - 10 + i))
+    assert len(list(tmp_path.glob("*.json"))) <= 3
+    os.utime(c._path("x4"), (0, 0))  # older than max_age
+    c.save("y", {"rows": []})
+    assert c.load("x4") is None and c.load("y") is not None